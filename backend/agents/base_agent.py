@@ -1,55 +1,288 @@
 import torch
-from transformers import AutoTokenizer, T5ForConditionalGeneration
 import logging
 import os
 import asyncio
-from typing import Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from .batching import BatchScheduler
+from .llm_cache import llm_cache
+from .model_registry import model_registry
+from .skill_taxonomy import skill_taxonomy
 
 logger = logging.getLogger(__name__)
 
+# Number of threads used to run model inference off the event loop
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_storage_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_schedulers: Dict[Tuple[str, str], BatchScheduler] = {}
+
+# Decoding settings shared by every generate call; part of the response cache key
+GENERATION_PARAMS = {
+    "num_beams": 4,
+    "temperature": 0.7,
+    "early_stopping": True,
+    "no_repeat_ngram_size": 2
+}
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor used for model inference."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            logger.info(f"Starting inference executor with {INFERENCE_WORKERS} worker(s)")
+            _executor = ThreadPoolExecutor(
+                max_workers=INFERENCE_WORKERS,
+                thread_name_prefix="inference"
+            )
+        return _executor
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    """Return the single thread that runs response cache and skill table I/O off the event loop.
+
+    It is separate from the inference executor so cache hits do not wait
+    behind a running generation.
+    """
+    global _storage_executor
+    with _executor_lock:
+        if _storage_executor is None:
+            _storage_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+        return _storage_executor
+
+def batching_stats() -> Dict[str, Dict[str, float]]:
+    """Batch scheduler counters for each model, keyed like ModelRegistry.memory_usage."""
+    with _executor_lock:
+        return {f"{name}@{device}": scheduler.stats() for (name, device), scheduler in _schedulers.items()}
+
 class BaseAgent:
     def __init__(self):
         try:
             self.model_name = "google/flan-t5-base"  # Using a larger model for better results
             self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
             logger.info(f"Using device: {self.device}")
-            
-            logger.info("Loading tokenizer...")
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            
-            logger.info("Loading model...")
-            self.model = T5ForConditionalGeneration.from_pretrained(self.model_name)
-            self.model = self.model.to(self.device)
-            logger.info("Model loaded successfully")
-            
+
+            # All agents share a single copy of each model
+            self.tokenizer, self.model = model_registry.get(self.model_name, self.device)
+            logger.info(f"{type(self).__name__} attached to {self.model_name}")
+
         except Exception as e:
             logger.error(f"Error initializing BaseAgent: {str(e)}")
             raise
-    
-    async def process(self, input_text: str, max_length: int = 150) -> str:
-        try:
-            # Tokenize input
-            inputs = self.tokenizer(
-                input_text,
-                return_tensors="pt",
-                max_length=512,
-                truncation=True
-            ).to(self.device)
-            
-            # Generate output
+
+    @property
+    def scheduler(self) -> BatchScheduler:
+        """The batching scheduler shared by every agent using this model."""
+        key = (self.model_name, str(self.device))
+        with _executor_lock:
+            if key not in _schedulers:
+                _schedulers[key] = BatchScheduler(self._generate_batch, get_inference_executor)
+            return _schedulers[key]
+
+    def _generate_batch(self, input_texts: List[str], max_length: int) -> List[str]:
+        """Run tokenization, generation and decoding for a padded batch synchronously."""
+        # Tokenize inputs, padding to the longest prompt in the batch
+        inputs = self.tokenizer(
+            input_texts,
+            return_tensors="pt",
+            max_length=512,
+            truncation=True,
+            padding=True
+        ).to(self.device)
+
+        # Generate outputs
+        with torch.no_grad():
             outputs = self.model.generate(
                 inputs.input_ids,
+                attention_mask=inputs.attention_mask,
                 max_length=max_length,
-                num_beams=4,
-                temperature=0.7,
-                early_stopping=True,
-                no_repeat_ngram_size=2
+                **GENERATION_PARAMS
+            )
+
+        # Decode and return
+        results = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        return [result.strip() for result in results]
+
+    def _choice_token_ids(self, choices: List[str]) -> List[int]:
+        """Map each choice label to the first token the decoder would emit for it."""
+        token_ids = []
+        for choice in choices:
+            ids = self.tokenizer(choice, add_special_tokens=False).input_ids
+            if not ids:
+                raise ValueError(f"Choice {choice!r} does not produce any tokens")
+            token_ids.append(ids[0])
+        if len(set(token_ids)) != len(token_ids):
+            raise ValueError(f"Choices {choices} are not distinguishable by their first token")
+        return token_ids
+
+    def _score_choices_batch(self, input_texts: List[str], choices: List[str]) -> List[Dict[str, float]]:
+        """Run one encoder pass and one decoder step and compare the logits of each choice."""
+        choice_ids = self._choice_token_ids(choices)
+        inputs = self.tokenizer(
+            input_texts,
+            return_tensors="pt",
+            max_length=512,
+            truncation=True,
+            padding=True
+        ).to(self.device)
+
+        decoder_input_ids = torch.full(
+            (inputs.input_ids.shape[0], 1),
+            self.model.config.decoder_start_token_id,
+            dtype=torch.long,
+            device=self.device
+        )
+        with torch.no_grad():
+            logits = self.model(
+                input_ids=inputs.input_ids,
+                attention_mask=inputs.attention_mask,
+                decoder_input_ids=decoder_input_ids
+            ).logits[:, 0, :]
+
+        probs = torch.softmax(logits[:, choice_ids].float(), dim=-1)
+        return [dict(zip(choices, row)) for row in probs.tolist()]
+
+    async def _cached(self, input_texts: List[str], params: Dict[str, Any], compute) -> List[Any]:
+        """Serve results from the response cache and compute only the misses."""
+        keys = [llm_cache.make_key(self.model_name, text, params) for text in input_texts]
+        loop = asyncio.get_running_loop()
+        # The memory tier is answered in place; SQLite reads and writes happen off the event loop
+        results = llm_cache.get_many(keys, disk=False)
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            from_disk = await loop.run_in_executor(
+                get_storage_executor(), llm_cache.get_many, [keys[i] for i in missing]
             )
-            
-            # Decode and return
-            result = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            return result.strip()
-            
+            for i, value in zip(missing, from_disk):
+                results[i] = value
+            missing = [i for i in missing if results[i] is None]
+        if missing:
+            computed = await compute([input_texts[i] for i in missing])
+            for i, value in zip(missing, computed):
+                results[i] = value
+            await loop.run_in_executor(
+                get_storage_executor(),
+                llm_cache.put_many,
+                [(keys[i], self.model_name, results[i]) for i in missing]
+            )
+        return results
+
+    async def process(self, input_text: str, max_length: int = 150) -> str:
+        async def compute(texts: List[str]) -> List[str]:
+            # Concurrent calls are grouped into one batch and run off the event loop
+            return [await self.scheduler.submit(texts[0], max_length)]
+
+        try:
+            params = dict(GENERATION_PARAMS, op="generate", max_length=max_length)
+            return (await self._cached([input_text], params, compute))[0]
+
         except Exception as e:
             logger.error(f"Error processing text: {str(e)}\nInput text: {input_text}")
             raise
+
+    async def process_batch(self, input_texts: List[str], max_length: int = 150, batch_size: int = 64) -> List[str]:
+        """Run many prompts as padded batches in a single executor call."""
+        if not input_texts:
+            return []
+
+        def run_all(texts: List[str]) -> List[str]:
+            results = []
+            for start in range(0, len(texts), batch_size):
+                results.extend(self._generate_batch(texts[start:start + batch_size], max_length))
+            return results
+
+        async def compute(texts: List[str]) -> List[str]:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_inference_executor(), run_all, texts)
+
+        try:
+            params = dict(GENERATION_PARAMS, op="generate", max_length=max_length)
+            return await self._cached(list(input_texts), params, compute)
+
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(input_texts)} texts: {str(e)}")
+            raise
+
+    async def score_choices(self, input_texts: List[str], choices: List[str], batch_size: int = 64) -> List[Dict[str, float]]:
+        """Return the probability of each choice label for every prompt, using a single forward pass."""
+        if not input_texts:
+            return []
+
+        def run_all(texts: List[str]) -> List[Dict[str, float]]:
+            results = []
+            for start in range(0, len(texts), batch_size):
+                results.extend(self._score_choices_batch(texts[start:start + batch_size], choices))
+            return results
+
+        async def compute(texts: List[str]) -> List[Dict[str, float]]:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_inference_executor(), run_all, texts)
+
+        try:
+            params = {"op": "score_choices", "choices": list(choices)}
+            return await self._cached(list(input_texts), params, compute)
+
+        except Exception as e:
+            logger.error(f"Error scoring choices {choices} for {len(input_texts)} texts: {str(e)}")
+            raise
+
+    async def classify(self, input_text: str, choices: List[str]) -> Dict[str, float]:
+        """Return the probability of each choice label for a single prompt."""
+        results = await self.score_choices([input_text], choices)
+        return results[0]
+
+    def _scale_labels(self, low: int, high: int) -> List[str]:
+        """Labels for the integer scores low..high that the decoder can tell apart in one step."""
+        labels = []
+        seen = set()
+        for value in range(low, high + 1):
+            token_id = self._choice_token_ids([str(value)])[0]
+            if token_id in seen:
+                logger.warning(f"Score {value} shares its first token with a lower score and is skipped")
+                continue
+            seen.add(token_id)
+            labels.append(str(value))
+        return labels
+
+    async def score_scale(self, input_texts: List[str], low: int = 0, high: int = 10) -> List[Dict[str, float]]:
+        """Read the decoder's distribution over the scores low..high in one forward pass.
+
+        Returns the expected score and the probability of the most likely score
+        (as ``confidence``) for every prompt.
+        """
+        labels = self._scale_labels(low, high)
+        distributions = await self.score_choices(input_texts, labels)
+        return [
+            {
+                "expected": sum(int(label) * prob for label, prob in dist.items()),
+                "confidence": max(dist.values())
+            }
+            for dist in distributions
+        ]
+
+    async def extract_skill_lists(
+        self,
+        texts: List[str],
+        prompts: List[str],
+        parse: Callable[[str], List[str]]
+    ) -> List[List[str]]:
+        """Extract the skills of every text, matching against the skill taxonomy first.
+
+        Only the prompts of texts in which the taxonomy finds too few skills are
+        sent to the model, as one batched call, to pick up skills it does not know; those
+        are appended after the taxonomy's own matches.
+        """
+        skill_lists = [skill_taxonomy.extract(text) for text in texts]
+        fallback = [i for i, skills in enumerate(skill_lists) if skill_taxonomy.needs_llm(skills)]
+        if fallback:
+            logger.info(f"Taxonomy matched too few skills in {len(fallback)} of {len(texts)} texts, asking the model")
+            try:
+                outputs = await self.process_batch([prompts[i] for i in fallback])
+            except Exception as e:
+                logger.error(f"Error extracting skills with the model, keeping taxonomy matches: {str(e)}")
+                return skill_lists
+            for i, output in zip(fallback, outputs):
+                skill_lists[i] = skill_taxonomy.merge(skill_lists[i], parse(output))
+        return skill_lists
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How long to wait for more prompts before running a batch, and the largest batch to run
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "10"))
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+
+class BatchScheduler:
+    """Collects prompts from concurrent callers and runs them as padded batches.
+
+    ``run_batch(prompts, max_length)`` is called on ``executor`` with every prompt
+    that arrived within ``window_ms`` of the first one (or as soon as
+    ``max_batch_size`` prompts are waiting) and must return one output per prompt.
+    Prompts with different ``max_length`` values are batched separately.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[str], int], List[str]],
+        executor_factory: Callable[[], Executor],
+        max_batch_size: int = BATCH_MAX_SIZE,
+        window_ms: float = BATCH_WINDOW_MS
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.run_batch = run_batch
+        self.executor_factory = executor_factory
+        self.max_batch_size = max_batch_size
+        self.window_ms = window_ms
+        self._pending: List[Tuple[str, int, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches_run = 0
+        self.prompts_run = 0
+
+    async def submit(self, prompt: str, max_length: int) -> str:
+        """Queue a prompt and wait for its decoded output."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A new event loop (e.g. a fresh asyncio.run) starts with a clean queue
+            self._loop = loop
+            self._pending = []
+            self._flush_handle = None
+
+        future = loop.create_future()
+        self._pending.append((prompt, max_length, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_ms / 1000.0, self._flush)
+
+        return await future
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches_run": self.batches_run,
+            "prompts_run": self.prompts_run,
+            "average_batch_size": self.prompts_run / self.batches_run if self.batches_run else 0.0
+        }
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        groups: Dict[int, List[Tuple[str, asyncio.Future]]] = {}
+        for prompt, max_length, future in pending:
+            if not future.cancelled():
+                groups.setdefault(max_length, []).append((prompt, future))
+
+        for max_length, items in groups.items():
+            for start in range(0, len(items), self.max_batch_size):
+                chunk = items[start:start + self.max_batch_size]
+                self._loop.create_task(self._run_chunk(chunk, max_length))
+
+    async def _run_chunk(self, chunk: List[Tuple[str, asyncio.Future]], max_length: int):
+        prompts = [prompt for prompt, _ in chunk]
+        try:
+            outputs = await self._loop.run_in_executor(
+                self.executor_factory(), self.run_batch, prompts, max_length
+            )
+        except Exception as e:
+            logger.error(f"Error running batch of {len(prompts)} prompts: {str(e)}")
+            for _, future in chunk:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.prompts_run += len(prompts)
+        for (_, future), output in zip(chunk, outputs):
+            if not future.done():
+                future.set_result(output)
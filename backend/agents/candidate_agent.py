@@ -1,21 +1,58 @@
 from .base_agent import BaseAgent
+from typing import Dict, List, Optional
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Years of experience assumed for an analyzed level when the resume states no number
+EXPERIENCE_LEVEL_YEARS = {
+    "Entry Level": 1,
+    "Mid Level": 4,
+    "Senior": 8
+}
+
+_YEARS_PATTERN = re.compile(r"(\d{1,2})\+?\s*(?:years|yrs)", re.IGNORECASE)
+
+def estimate_experience_years(resume: str, experience_level: Optional[str] = None) -> Optional[int]:
+    """Years of experience stated in the resume, or the typical value for the analyzed level."""
+    stated = [int(years) for years in _YEARS_PATTERN.findall(resume or "")]
+    if stated:
+        return max(stated)
+    return EXPERIENCE_LEVEL_YEARS.get(experience_level)
+
+def parse_skill_list(text: str) -> List[str]:
+    """Split a generated comma- or newline-separated skill list, dropping blanks and repeats."""
+    skills = []
+    seen = set()
+    for skill in text.replace("\n", ",").split(","):
+        skill = skill.strip().lstrip("-* ").rstrip(".")
+        if skill and skill.lower() not in seen:
+            seen.add(skill.lower())
+            skills.append(skill)
+    return skills
+
 class CandidateScreeningAgent(BaseAgent):
-    async def extract_skills(self, resume: str) -> str:
-        prompt = f"""
+    def _skills_prompt(self, resume: str) -> str:
+        return f"""
         Task: Extract technical skills from this resume.
         Format: Return ONLY a comma-separated list of skills, no explanations.
         Resume: {resume}
         Skills:"""
+
+    async def extract_skills(self, resume: str) -> str:
         try:
-            return await self.process(prompt)
+            return ", ".join((await self.extract_skills_batch([resume]))[0])
         except Exception as e:
             logger.error(f"Error extracting candidate skills: {str(e)}")
             return ""
 
+    async def extract_skills_batch(self, resumes: List[str]) -> List[List[str]]:
+        """Extract the skill list of every resume from the skill taxonomy, falling back to one batched generation call."""
+        return await self.extract_skill_lists(
+            resumes, [self._skills_prompt(resume) for resume in resumes], parse_skill_list
+        )
+
     async def evaluate_technical(self, resume: str, required_skills: list[str]) -> float:
         skills_str = ", ".join(required_skills)
         prompt = f"""
@@ -30,8 +67,9 @@ class CandidateScreeningAgent(BaseAgent):
         
         Return ONLY the numerical score (0-10):"""
         try:
-            result = await self.process(prompt)
-            return float(result.strip()) / 10.0
+            result = (await self.score_scale([prompt], 0, 10))[0]
+            logger.info(f"Technical score: {result['expected']:.2f} (confidence {result['confidence']:.2f})")
+            return result["expected"] / 10.0
         except Exception as e:
             logger.error(f"Error evaluating technical score: {str(e)}")
             return 0.0
@@ -49,14 +87,15 @@ class CandidateScreeningAgent(BaseAgent):
         
         Return ONLY the numerical score (0-10):"""
         try:
-            result = await self.process(prompt)
-            return float(result.strip()) / 10.0
+            result = (await self.score_scale([prompt], 0, 10))[0]
+            logger.info(f"Behavioral score: {result['expected']:.2f} (confidence {result['confidence']:.2f})")
+            return result["expected"] / 10.0
         except Exception as e:
             logger.error(f"Error evaluating behavioral score: {str(e)}")
             return 0.0
 
-    async def analyze_candidate(self, resume: str) -> dict:
-        prompt = f"""
+    def _analysis_prompt(self, resume: str) -> str:
+        return f"""
         Task: Provide a comprehensive candidate analysis
         Resume: {resume}
         
@@ -67,23 +106,33 @@ class CandidateScreeningAgent(BaseAgent):
         4. Overall Assessment
         
         Analysis:"""
+
+    @staticmethod
+    def _parse_analysis(analysis: str) -> Dict:
+        # Extract experience level
+        experience_level = "Entry Level"
+        if "senior" in analysis.lower():
+            experience_level = "Senior"
+        elif "mid" in analysis.lower() or "intermediate" in analysis.lower():
+            experience_level = "Mid Level"
+        
+        return {
+            "experience_level": experience_level,
+            "analysis": analysis
+        }
+
+    async def analyze_candidate(self, resume: str) -> dict:
         try:
-            analysis = await self.process(prompt)
-            
-            # Extract experience level
-            experience_level = "Entry Level"
-            if "senior" in analysis.lower():
-                experience_level = "Senior"
-            elif "mid" in analysis.lower() or "intermediate" in analysis.lower():
-                experience_level = "Mid Level"
-            
-            return {
-                "experience_level": experience_level,
-                "analysis": analysis
-            }
+            analysis = await self.process(self._analysis_prompt(resume))
+            return self._parse_analysis(analysis)
         except Exception as e:
             logger.error(f"Error analyzing candidate: {str(e)}")
             return {
                 "experience_level": "Entry Level",
                 "analysis": "Error analyzing candidate profile"
             }
+
+    async def analyze_candidates_batch(self, resumes: List[str]) -> List[Dict]:
+        """Analyze every resume with one batched generation call."""
+        outputs = await self.process_batch([self._analysis_prompt(resume) for resume in resumes])
+        return [self._parse_analysis(output) for output in outputs]
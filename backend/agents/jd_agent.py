@@ -1,17 +1,22 @@
 from .base_agent import BaseAgent
+from .candidate_agent import parse_skill_list
 import logging
 
 logger = logging.getLogger(__name__)
 
 class JDProcessingAgent(BaseAgent):
-    async def extract_skills(self, description: str) -> str:
-        prompt = f"""
+    @staticmethod
+    def _skills_prompt(description: str) -> str:
+        return f"""
         Task: Extract technical skills from the job description.
         Format: Return as comma-separated list
         Job Description: {description}
         Skills:"""
+
+    async def extract_skills(self, description: str) -> str:
         try:
-            return await self.process(prompt)
+            skills = await self.extract_skill_lists([description], [self._skills_prompt(description)], parse_skill_list)
+            return ", ".join(skills[0])
         except Exception as e:
             logger.error(f"Error extracting skills: {str(e)}")
             return ""
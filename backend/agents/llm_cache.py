@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from . import sqlite_store
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./data/llm_cache.db")
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "4096"))
+LLM_CACHE_DISK_SIZE = int(os.getenv("LLM_CACHE_DISK_SIZE", "100000"))
+
+# Keys per "IN (...)" lookup, below SQLite's default host parameter limit
+SQLITE_MAX_PARAMS = 500
+
+class LLMCache:
+    """Two-tier cache of model outputs: an in-memory LRU in front of a SQLite table.
+
+    Keys are built from the model name, a hash of the prompt and the generation
+    parameters, so changing any of them produces a different entry. Values must
+    be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        memory_size: int = LLM_CACHE_MEMORY_SIZE,
+        disk_size: int = LLM_CACHE_DISK_SIZE,
+        enabled: bool = LLM_CACHE_ENABLED
+    ):
+        self.path = path
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        # The memory tier and the SQLite tier have separate locks so a memory lookup
+        # never waits behind a commit or a prune running on the storage thread
+        self._memory_lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._puts_since_prune = 0
+        # Keys read from disk whose last_used update has not been written yet
+        self._touched: Dict[str, float] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str, params: Dict[str, Any]) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raw = json.dumps([model_name, prompt_hash, params], sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: List[str], disk: bool = True) -> List[Optional[Any]]:
+        """Return the cached value (or None) for every key, reading the disk tier in one query.
+
+        With ``disk=False`` only the in-memory tier is consulted and misses are
+        not counted. That path only takes the memory lock, which is never held
+        during SQLite work, so it is safe on the event loop.
+        """
+        results: List[Optional[Any]] = [None] * len(keys)
+        if not self.enabled:
+            return results
+        on_disk = []
+        with self._memory_lock:
+            for i, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    results[i] = self._memory[key][1]
+                else:
+                    on_disk.append(i)
+        if not disk or not on_disk:
+            return results
+
+        rows = {}
+        wanted = list({keys[i] for i in on_disk})
+        with self._disk_lock:
+            conn = self._connection()
+            for start in range(0, len(wanted), SQLITE_MAX_PARAMS):
+                chunk = wanted[start:start + SQLITE_MAX_PARAMS]
+                rows.update(
+                    (key, (model_name, raw_value)) for key, model_name, raw_value in conn.execute(
+                        f"SELECT key, model_name, value FROM llm_cache WHERE key IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    )
+                )
+            # Recency is written with the next store instead of committing on every hit
+            now = time.time()
+            self._touched.update((key, now) for key in rows)
+
+        with self._memory_lock:
+            for i in on_disk:
+                row = rows.get(keys[i])
+                if row is None:
+                    self.misses += 1
+                    continue
+                model_name, raw_value = row
+                results[i] = json.loads(raw_value)
+                self._remember(keys[i], model_name, results[i])
+                self.disk_hits += 1
+        return results
+
+    def put(self, key: str, model_name: str, value: Any):
+        """Store value in both tiers, evicting the least recently used entries when full."""
+        self.put_many([(key, model_name, value)])
+
+    def put_many(self, entries: List[Tuple[str, str, Any]]):
+        """Store (key, model name, value) entries in both tiers with one disk transaction."""
+        if not self.enabled or not entries:
+            return
+        with self._memory_lock:
+            for key, model_name, value in entries:
+                self._remember(key, model_name, value)
+        with self._disk_lock:
+            now = time.time()
+            for key, _, _ in entries:
+                self._touched.pop(key, None)
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO llm_cache (key, model_name, value, last_used) VALUES (?, ?, ?, ?)",
+                [(key, model_name, json.dumps(value), now) for key, model_name, value in entries]
+            )
+            self._write_touched(conn)
+            conn.commit()
+
+            self._puts_since_prune += len(entries)
+            if self._puts_since_prune >= max(1, self.disk_size // 100):
+                self._prune_disk()
+
+    def flush(self):
+        """Write pending last-used times of disk hits."""
+        if not self.enabled:
+            return
+        with self._disk_lock:
+            if self._touched:
+                conn = self._connection()
+                self._write_touched(conn)
+                conn.commit()
+
+    def _write_touched(self, conn: sqlite3.Connection):
+        if self._touched:
+            conn.executemany(
+                "UPDATE llm_cache SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def invalidate(self, model_name: Optional[str] = None) -> int:
+        """Drop every entry, or only those produced by model_name. Returns the number removed."""
+        with self._memory_lock:
+            if model_name is None:
+                self._memory.clear()
+            else:
+                for key in [k for k, (name, _) in self._memory.items() if name == model_name]:
+                    del self._memory[key]
+
+        with self._disk_lock:
+            conn = self._connection()
+            if model_name is None:
+                removed = conn.execute("DELETE FROM llm_cache").rowcount
+            else:
+                removed = conn.execute("DELETE FROM llm_cache WHERE model_name = ?", (model_name,)).rowcount
+            conn.commit()
+        logger.info(f"Invalidated {removed} cached LLM responses")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        disk_entries = 0
+        if self.enabled:
+            with self._disk_lock:
+                disk_entries = self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        with self._memory_lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "memory_entries": len(self._memory),
+                "memory_size": self.memory_size,
+                "disk_entries": disk_entries,
+                "disk_size": self.disk_size,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+    def _remember(self, key: str, model_name: str, value: Any):
+        self._memory[key] = (model_name, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _prune_disk(self):
+        self._puts_since_prune = 0
+        conn = self._connection()
+        self._write_touched(conn)
+        count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count <= self.disk_size:
+            return
+        conn.execute(
+            "DELETE FROM llm_cache WHERE key IN "
+            "(SELECT key FROM llm_cache ORDER BY last_used ASC LIMIT ?)",
+            (count - self.disk_size,)
+        )
+        conn.commit()
+        logger.info(f"Evicted {count - self.disk_size} cached LLM responses from disk")
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite_store.connect(self.path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, model_name TEXT NOT NULL, "
+                "value TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_model_name ON llm_cache (model_name)")
+            self._conn.commit()
+        return self._conn
+
+llm_cache = LLMCache()
@@ -0,0 +1,58 @@
+import torch
+from transformers import AutoTokenizer, T5ForConditionalGeneration
+import logging
+import threading
+from typing import Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """Process-wide cache of loaded models keyed by model name and device."""
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, device: torch.device) -> Tuple[Any, Any]:
+        """Return (tokenizer, model), loading them on first use."""
+        key = (model_name, str(device))
+        with self._lock:
+            if key not in self._models:
+                logger.info(f"Loading tokenizer for {model_name}...")
+                tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+                logger.info(f"Loading model {model_name} on {device}...")
+                model = T5ForConditionalGeneration.from_pretrained(model_name)
+                model = model.to(device)
+                model.eval()
+
+                self._models[key] = (tokenizer, model)
+                logger.info(f"Model {model_name} loaded successfully "
+                            f"({self._model_memory(model) / 2**20:.1f} MiB)")
+            return self._models[key]
+
+    def unload(self, model_name: str, device: torch.device) -> bool:
+        """Drop a model from the registry. Returns True if it was loaded."""
+        with self._lock:
+            return self._models.pop((model_name, str(device)), None) is not None
+
+    def memory_usage(self) -> Dict[str, Dict[str, Any]]:
+        """Report the parameter and buffer memory used by each loaded model."""
+        with self._lock:
+            return {
+                f"{name}@{device}": {
+                    "model_name": name,
+                    "device": device,
+                    "parameters": sum(p.numel() for p in model.parameters()),
+                    "memory_bytes": self._model_memory(model)
+                }
+                for (name, device), (_, model) in self._models.items()
+            }
+
+    @staticmethod
+    def _model_memory(model) -> int:
+        params = sum(p.numel() * p.element_size() for p in model.parameters())
+        buffers = sum(b.numel() * b.element_size() for b in model.buffers())
+        return params + buffers
+
+model_registry = ModelRegistry()
@@ -1,55 +1,122 @@
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, get_storage_executor
+from .candidate_agent import parse_skill_list
+from .skill_equivalence import skill_equivalence, normalize_skill
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+async def load_skill_equivalence():
+    """Read the skill equivalence table on the storage thread so lookups on the event loop never hit SQLite."""
+    if not skill_equivalence.loaded:
+        await asyncio.get_running_loop().run_in_executor(get_storage_executor(), skill_equivalence.load)
+
 class AutoScreeningAgent(BaseAgent):
     def __init__(self):
         super().__init__()
         logger.info("AutoScreeningAgent initialized")
 
-    async def screen_all_candidates(self, jobs: List[Dict], candidates: List[Dict]) -> List[Dict]:
-        """Screen all candidates against all jobs automatically."""
+    async def screen_all_candidates(
+        self,
+        jobs: List[Dict],
+        candidates: List[Dict],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        skill_index=None,
+        min_skill_overlap: int = 1
+    ) -> List[Dict]:
+        """Screen all candidates against all jobs automatically.
+
+        Collects everything ``iter_matches`` yields and returns it sorted by
+        score.
+        """
+        matches = [
+            match async for match in self.iter_matches(
+                jobs, candidates, on_progress, skill_index, min_skill_overlap
+            )
+        ]
+        
+        # Sort matches by score in descending order
+        matches.sort(key=lambda x: x["match_score"], reverse=True)
+        logger.info(f"Auto screening completed. Found {len(matches)} matches")
+        return matches
+
+    async def iter_matches(
+        self,
+        jobs: List[Dict],
+        candidates: List[Dict],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        skill_index=None,
+        min_skill_overlap: int = 1
+    ) -> AsyncIterator[Dict]:
+        """Yield each match above the threshold as soon as it is scored.
+
+        When a ``skill_index`` is given, only candidates sharing at least
+        ``min_skill_overlap`` required skills (or known equivalents) with a job
+        are evaluated for it. ``on_progress(done, total)`` is called after
+        every evaluated pair.
+        """
         logger.info(f"Starting auto screening for {len(candidates)} candidates and {len(jobs)} jobs")
+        await load_skill_equivalence()
         
-        matches = []
+        job_candidates = []
         for job in jobs:
+            if skill_index is None:
+                job_candidates.append(candidates)
+            else:
+                job_candidates.append(skill_index.filter_candidates(
+                    job.get("required_skills", []),
+                    candidates,
+                    min_overlap=min_skill_overlap,
+                    expand=skill_equivalence.equivalents
+                ))
+
+        total_pairs = sum(len(plausible) for plausible in job_candidates)
+        done_pairs = 0
+        logger.info(f"Evaluating {total_pairs} of {len(jobs) * len(candidates)} candidate-job pairs")
+        if on_progress:
+            on_progress(done_pairs, total_pairs)
+        for job, plausible in zip(jobs, job_candidates):
             logger.info(f"Processing job: {job['title']}")
-            for candidate in candidates:
+            # Check every candidate's skills against this job in one batched inference call
+            skill_matches = await self._calculate_skill_matches([
+                (job.get("required_skills", []), candidate.get("skills", []))
+                for candidate in plausible
+            ])
+            for candidate, skill_match in zip(plausible, skill_matches):
                 logger.info(f"Processing candidate: {candidate['name']}")
+                match = None
                 try:
-                    match = await self.evaluate_match(job, candidate)
+                    match = await self.evaluate_match(job, candidate, skill_match=skill_match)
                     logger.info(f"Match score: {match['match_score']}")
-                    if match["match_score"] >= 0.5:  # Lowered threshold to 50%
-                        match["job"] = job
-                        match["candidate"] = candidate
-                        matches.append(match)
-                        logger.info(f"Found match: Candidate {candidate['name']} - Job {job['title']} - Score {match['match_score']}")
                 except Exception as e:
                     logger.error(f"Error matching candidate {candidate.get('name')} with job {job.get('title')}: {str(e)}")
                     logger.exception("Full traceback:")
-        
-        # Sort matches by score in descending order
-        matches.sort(key=lambda x: x["match_score"], reverse=True)
-        logger.info(f"Auto screening completed. Found {len(matches)} matches")
-        return matches
+                done_pairs += 1
+                if on_progress:
+                    on_progress(done_pairs, total_pairs)
+                if match is not None and match["match_score"] >= 0.5:  # Lowered threshold to 50%
+                    match["job"] = job
+                    match["candidate"] = candidate
+                    logger.info(f"Found match: Candidate {candidate['name']} - Job {job['title']} - Score {match['match_score']}")
+                    yield match
 
-    async def evaluate_match(self, job: Dict, candidate: Dict) -> Dict:
+    async def evaluate_match(self, job: Dict, candidate: Dict, skill_match: Optional[Dict] = None) -> Dict:
         """Evaluate a single candidate against a job."""
         logger.info(f"Evaluating match between candidate {candidate['name']} and job {job['title']}")
         
-        # Calculate skill match
-        skill_match = await self._calculate_skill_match(
-            job.get("required_skills", []), 
-            candidate.get("skills", [])
-        )
+        # Calculate skill match unless it was already computed in a batch
+        if skill_match is None:
+            skill_match = await self._calculate_skill_match(
+                job.get("required_skills", []), 
+                candidate.get("skills", [])
+            )
         
         # Calculate experience match
         exp_match = await self._calculate_experience_match(
             job.get("experience_level", "Entry Level"),
-            candidate.get("experience", 0)
+            # Imported candidates may have skills but no recorded experience
+            candidate.get("experience") or 0
         )
         
         # Generate interview questions for matched skills
@@ -76,34 +143,74 @@ class AutoScreeningAgent(BaseAgent):
     async def _calculate_skill_match(self, required_skills: List[str], candidate_skills: List[str]) -> Dict:
         """Calculate the skill match score and identify matching skills."""
         logger.info(f"Calculating skill match. Required: {required_skills}, Candidate: {candidate_skills}")
-        
-        if not required_skills or not candidate_skills:
-            return {"score": 0, "matched_skills": [], "missing_skills": required_skills or []}
+        results = await self._calculate_skill_matches([(required_skills, candidate_skills)])
+        return results[0]
 
-        matched_skills = []
-        for req_skill in required_skills:
-            prompt = f"""
-            Check if the required skill matches any of these candidate skills.
-            Required: {req_skill}
-            Candidate skills: {', '.join(candidate_skills)}
-            Consider similar technologies. Answer yes or no."""
-            
+    async def _calculate_skill_matches(self, pairs: List[Tuple[List[str], List[str]]]) -> List[Dict]:
+        """Calculate skill matches for many (required, candidate) skill lists.
+
+        Skill compatibility is read from the skill equivalence table; only skill
+        pairs it has never seen are sent to the model, as one batched call.
+        """
+        await load_skill_equivalence()
+        unknown = []
+        seen = set()
+        for required_skills, candidate_skills in pairs:
+            for req_skill in required_skills or []:
+                for cand_skill in candidate_skills or []:
+                    key = (normalize_skill(req_skill), normalize_skill(cand_skill))
+                    if key not in seen and skill_equivalence.lookup(req_skill, cand_skill) is None:
+                        seen.add(key)
+                        unknown.append((req_skill, cand_skill))
+
+        if unknown:
+            logger.info(f"Checking {len(unknown)} unseen skill pairs with the model")
             try:
-                response = await self.process(prompt)
-                if "yes" in response.lower():
-                    matched_skills.append(req_skill)
+                # One forward pass per pair: compare the "yes" and "no" logits instead of generating
+                responses = await self.score_choices(
+                    [self._skill_match_prompt(req_skill, cand_skill) for req_skill, cand_skill in unknown],
+                    ["yes", "no"]
+                )
+                # Recording commits to SQLite, so it runs off the event loop
+                await asyncio.get_running_loop().run_in_executor(
+                    get_storage_executor(),
+                    skill_equivalence.record_many,
+                    [
+                        (req_skill, cand_skill, probs["yes"] > probs["no"])
+                        for (req_skill, cand_skill), probs in zip(unknown, responses)
+                    ]
+                )
             except Exception as e:
-                logger.error(f"Error processing skill match for {req_skill}: {str(e)}")
-        
-        score = len(matched_skills) / len(required_skills) if required_skills else 0
-        missing_skills = [s for s in required_skills if s not in matched_skills]
-        
-        logger.info(f"Skill match results - Score: {score}, Matched: {matched_skills}, Missing: {missing_skills}")
-        return {
-            "score": score,
-            "matched_skills": matched_skills,
-            "missing_skills": missing_skills
-        }
+                logger.error(f"Error processing skill matches: {str(e)}")
+
+        results = []
+        for required_skills, candidate_skills in pairs:
+            if not required_skills or not candidate_skills:
+                results.append({"score": 0, "matched_skills": [], "missing_skills": required_skills or []})
+                continue
+
+            matched_skills = [
+                req_skill for req_skill in required_skills
+                if any(skill_equivalence.lookup(req_skill, cand_skill) for cand_skill in candidate_skills)
+            ]
+            score = len(matched_skills) / len(required_skills)
+            missing_skills = [s for s in required_skills if s not in matched_skills]
+
+            logger.info(f"Skill match results - Score: {score}, Matched: {matched_skills}, Missing: {missing_skills}")
+            results.append({
+                "score": score,
+                "matched_skills": matched_skills,
+                "missing_skills": missing_skills
+            })
+        return results
+
+    @staticmethod
+    def _skill_match_prompt(req_skill: str, cand_skill: str) -> str:
+        return f"""
+            Check if the candidate skill satisfies the required skill.
+            Required: {req_skill}
+            Candidate skill: {cand_skill}
+            Consider similar technologies. Answer yes or no."""
 
     async def _calculate_experience_match(self, required_level: str, candidate_experience: int) -> float:
         """Calculate the experience match score."""
@@ -170,33 +277,60 @@ class AutoScreeningAgent(BaseAgent):
     async def process_full_description(self, title: str, description: str) -> Dict:
         """Process a job description to extract standardized role and required skills."""
         try:
-            # Extract skills from description
-            prompt = f"""
+            # Extract skills from description, asking the model only if the taxonomy finds too few
+            required_skills = await self.extract_skill_lists(
+                [f"{title}\n{description}"], [self._jd_skills_prompt(title, description)], parse_skill_list
+            )
+            
+            # Determine experience level
+            experience_level = await self.process(self._jd_experience_prompt(title, description))
+            
+            return self._parse_description(title, description, required_skills[0], experience_level)
+            
+        except Exception as e:
+            logger.error(f"Error processing job description: {str(e)}")
+            raise
+
+    async def process_full_descriptions(self, descriptions: List[Tuple[str, str]]) -> List[Dict]:
+        """Process many (title, description) pairs, running each kind of prompt as one batched call."""
+        try:
+            skill_lists, experience_levels = await asyncio.gather(
+                self.extract_skill_lists(
+                    [f"{title}\n{description}" for title, description in descriptions],
+                    [self._jd_skills_prompt(title, description) for title, description in descriptions],
+                    parse_skill_list
+                ),
+                self.process_batch([self._jd_experience_prompt(title, description) for title, description in descriptions])
+            )
+        except Exception as e:
+            logger.error(f"Error processing {len(descriptions)} job descriptions: {str(e)}")
+            raise
+        return [
+            self._parse_description(title, description, required_skills, experience_level)
+            for (title, description), required_skills, experience_level in zip(descriptions, skill_lists, experience_levels)
+        ]
+
+    @staticmethod
+    def _jd_skills_prompt(title: str, description: str) -> str:
+        return f"""
             Extract required skills from this job description.
             Title: {title}
             Description: {description}
             List only the technical skills, one per line."""
-            
-            skills_response = await self.process(prompt)
-            skills = [s.strip() for s in skills_response.split('\n') if s.strip()]
-            
-            # Determine experience level
-            prompt = f"""
+
+    @staticmethod
+    def _jd_experience_prompt(title: str, description: str) -> str:
+        return f"""
             Determine the experience level required for this job.
             Title: {title}
             Description: {description}
             Answer with ONLY ONE of: Entry Level, Junior, Mid Level, Senior, Lead, Principal"""
-            
-            experience_level = await self.process(prompt)
-            experience_level = experience_level.strip()
-            
-            return {
-                "title": title,
-                "description": description,
-                "required_skills": skills,
-                "experience_level": experience_level
-            }
-            
-        except Exception as e:
-            logger.error(f"Error processing job description: {str(e)}")
-            raise
+
+    @staticmethod
+    def _parse_description(title: str, description: str, required_skills: List[str], experience_level: str) -> Dict:
+        return {
+            "title": title,
+            "description": description,
+            "required_skills": required_skills,
+            "experience_level": experience_level.strip()
+        }
@@ -0,0 +1,163 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+from . import sqlite_store
+
+logger = logging.getLogger(__name__)
+
+SKILL_EQUIVALENCE_PATH = os.getenv("SKILL_EQUIVALENCE_PATH", "./data/skill_equivalence.db")
+
+def normalize_skill(skill: str) -> str:
+    """Lower-case a skill name and collapse whitespace so trivially different spellings compare equal."""
+    return re.sub(r"\s+", " ", skill or "").strip().lower()
+
+class SkillEquivalenceStore:
+    """Persistent table recording whether a candidate skill satisfies a required skill.
+
+    Pairs are directional, ``(required, candidate)``, and stored by their
+    normalized names. The whole table is kept in memory, together with an
+    index from each required skill to its compatible candidate skills, once
+    ``load`` has run (the first lookup loads it if nothing did earlier).
+    ``refresh`` picks up pairs other processes have recorded since.
+    """
+
+    def __init__(self, path: str = SKILL_EQUIVALENCE_PATH):
+        self.path = path
+        self._pairs: Dict[Tuple[str, str], bool] = {}
+        self._compatible: Dict[str, Set[str]] = defaultdict(set)
+        self._loaded = False
+        self._conn: Optional[sqlite3.Connection] = None
+        # Highest rowid loaded into _pairs, so refresh() only reads newer rows
+        self._max_rowid = 0
+        # The in-memory tables and the SQLite connection have separate locks so lookups
+        # never wait behind a commit; when both are needed the disk lock is taken first
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> int:
+        """Read the table into memory if that has not happened yet. Returns the number of pairs read.
+
+        This does SQLite I/O, so async code should run it in an executor
+        before the first lookup.
+        """
+        with self._disk_lock:
+            if self._loaded:
+                return 0
+            rows = self._rows_since(0)
+            with self._lock:
+                self._apply(rows)
+                self._loaded = True
+        logger.info(f"Loaded {len(rows)} skill equivalence pairs")
+        return len(rows)
+
+    def lookup(self, required: str, candidate: str) -> Optional[bool]:
+        """Return whether candidate satisfies required, or None if the pair was never recorded."""
+        required, candidate = normalize_skill(required), normalize_skill(candidate)
+        if required == candidate:
+            return True
+        self._ensure_loaded()
+        with self._lock:
+            return self._pairs.get((required, candidate))
+
+    def record_many(self, results: Iterable[Tuple[str, str, bool]]):
+        """Record (required, candidate, compatible) results."""
+        rows = [
+            (normalize_skill(required), normalize_skill(candidate), bool(compatible))
+            for required, candidate, compatible in results
+        ]
+        if not rows:
+            return
+        self._ensure_loaded()
+        with self._lock:
+            for required, candidate, compatible in rows:
+                self._set(required, candidate, compatible)
+        with self._disk_lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO skill_equivalence (required, candidate, compatible) VALUES (?, ?, ?)",
+                [(required, candidate, int(compatible)) for required, candidate, compatible in rows]
+            )
+            self._conn.commit()
+        logger.info(f"Recorded {len(rows)} skill equivalence results")
+
+    def equivalents(self, required: str) -> Set[str]:
+        """Normalized candidate skills known to satisfy the required skill, including itself."""
+        required = normalize_skill(required)
+        self._ensure_loaded()
+        with self._lock:
+            return {required} | self._compatible.get(required, set())
+
+    def clear(self) -> int:
+        self._ensure_loaded()
+        with self._disk_lock:
+            self._conn.execute("DELETE FROM skill_equivalence")
+            self._conn.commit()
+            with self._lock:
+                removed = len(self._pairs)
+                self._reset()
+        return removed
+
+    def refresh(self) -> int:
+        """Load pairs recorded by other processes since the last load. Returns how many were read.
+
+        Every write gets a higher rowid than the rows already seen, so only the
+        new rows are read; if the table shrank (another process cleared it)
+        the whole table is reloaded.
+        """
+        if not self._loaded:
+            return self.load()
+        with self._disk_lock:
+            max_rowid = self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM skill_equivalence").fetchone()[0]
+            reload = max_rowid < self._max_rowid
+            rows = self._rows_since(0 if reload else self._max_rowid)
+            with self._lock:
+                if reload:
+                    self._reset()
+                self._apply(rows)
+        return len(rows)
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def _set(self, required: str, candidate: str, compatible: bool):
+        self._pairs[(required, candidate)] = compatible
+        if compatible:
+            self._compatible[required].add(candidate)
+        else:
+            self._compatible[required].discard(candidate)
+
+    def _reset(self):
+        self._pairs.clear()
+        self._compatible.clear()
+        self._max_rowid = 0
+
+    def _apply(self, rows):
+        for row_id, required, candidate, compatible in rows:
+            self._set(required, candidate, bool(compatible))
+            self._max_rowid = max(self._max_rowid, row_id)
+
+    def _rows_since(self, rowid: int) -> list:
+        return self._connection().execute(
+            "SELECT rowid, required, candidate, compatible FROM skill_equivalence WHERE rowid > ?", (rowid,)
+        ).fetchall()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite_store.connect(self.path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS skill_equivalence ("
+                "required TEXT NOT NULL, candidate TEXT NOT NULL, compatible INTEGER NOT NULL, "
+                "PRIMARY KEY (required, candidate))"
+            )
+            self._conn.commit()
+        return self._conn
+
+skill_equivalence = SkillEquivalenceStore()
@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from .skill_equivalence import normalize_skill
+
+logger = logging.getLogger(__name__)
+
+# Optional JSON file of {"Canonical Skill": ["alias", ...]} merged over the built-in taxonomy
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", "")
+# Documents where the taxonomy finds fewer skills than this are also sent to the model; 0 never calls it
+SKILL_LLM_FALLBACK_MIN_SKILLS = int(os.getenv("SKILL_LLM_FALLBACK_MIN_SKILLS", "3"))
+
+# Aliases this short only match with the exact casing given, so "Go" or "R" is not found in ordinary prose
+CASE_SENSITIVE_MAX_LENGTH = 2
+
+DEFAULT_TAXONOMY: Dict[str, List[str]] = {
+    # Languages
+    "Python": ["python3", "py"],
+    "Java": ["java se", "java ee", "j2ee"],
+    "JavaScript": ["javascript", "JS", "ecmascript", "es6"],
+    "TypeScript": ["typescript", "TS"],
+    "C": ["C", "ansi c"],
+    "C++": ["c++", "cpp"],
+    "C#": ["C#", "c sharp", "csharp"],
+    "Go": ["Go", "golang"],
+    "Rust": ["rust"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Swift": ["swift"],
+    "Kotlin": ["kotlin"],
+    "Scala": ["scala"],
+    "R": ["R", "rstats"],
+    "MATLAB": ["matlab"],
+    "Perl": ["perl"],
+    "Bash": ["bash", "shell scripting", "shell script"],
+    "SQL": ["sql", "t-sql", "pl/sql"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "sass", "scss"],
+    # Frameworks and libraries
+    "React": ["react", "react.js", "reactjs"],
+    "React Native": ["react native"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue.js": ["vue", "vue.js", "vuejs"],
+    "Next.js": ["next.js", "nextjs"],
+    "Node.js": ["node.js", "nodejs"],
+    "Express.js": ["express.js", "expressjs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring Framework": ["spring boot", "springboot", "spring mvc"],
+    "Ruby on Rails": ["rails", "ruby on rails", "ror"],
+    "ASP.NET": ["asp.net", "asp.net core"],
+    ".NET": [".net", "dotnet", ".net core"],
+    "jQuery": ["jquery"],
+    "Redux": ["redux"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["restful", "rest api", "rest apis", "restful apis"],
+    "gRPC": ["grpc"],
+    "SQLAlchemy": ["sqlalchemy"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "SciPy": ["scipy"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch", "torch"],
+    "Keras": ["keras"],
+    "Hugging Face Transformers": ["hugging face", "huggingface"],
+    "Spark": ["spark", "apache spark", "pyspark"],
+    "Hadoop": ["hadoop"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Airflow": ["airflow", "apache airflow"],
+    # Data stores
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MySQL": ["mysql"],
+    "SQLite": ["sqlite"],
+    "Oracle Database": ["oracle", "oracle db"],
+    "SQL Server": ["sql server", "mssql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic search"],
+    "Cassandra": ["cassandra"],
+    "DynamoDB": ["dynamodb"],
+    "Snowflake": ["snowflake"],
+    # Cloud and infrastructure
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure", "microsoft azure"],
+    "Google Cloud": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "Jenkins": ["jenkins"],
+    "CI/CD": ["ci/cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Git": ["git", "github", "gitlab"],
+    "Linux": ["linux", "unix"],
+    "Nginx": ["nginx"],
+    "Microservices": ["microservices", "microservice architecture"],
+    # Practices and fields
+    "Machine Learning": ["machine learning", "ML"],
+    "Deep Learning": ["deep learning"],
+    "Natural Language Processing": ["natural language processing", "NLP"],
+    "Computer Vision": ["computer vision"],
+    "Artificial Intelligence": ["artificial intelligence", "AI"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Data Engineering": ["data engineering", "etl"],
+    "Statistics": ["statistics", "statistical analysis"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Microsoft Excel": ["ms excel", "excel vba"],
+    "Agile": ["agile", "scrum", "kanban"],
+    "Test-Driven Development": ["tdd", "test-driven development", "test driven development"],
+    "Unit Testing": ["unit testing", "unit tests", "pytest", "junit", "jest"],
+    "Selenium": ["selenium"],
+    "UI/UX Design": ["ui/ux", "ux design", "ui design", "user experience"],
+    "Figma": ["figma"],
+    "System Design": ["system design", "distributed systems"],
+    "Cybersecurity": ["application security", "penetration testing"],
+}
+
+class SkillTaxonomy:
+    """Finds known skills in free text with one Aho–Corasick pass over every alias.
+
+    Matching is case-insensitive except for aliases of at most
+    ``CASE_SENSITIVE_MAX_LENGTH`` characters, and only whole words match, so
+    "Java" is not found inside "JavaScript". Where matches overlap, the
+    leftmost and then longest one wins ("React Native" over "React"). Found
+    skills are reported by their canonical names.
+    """
+
+    def __init__(self, taxonomy: Dict[str, Iterable[str]]):
+        self._canonical: Dict[str, str] = {}
+        # (alias as written, canonical name, case sensitive) for each pattern in the automaton
+        self._patterns: List[Tuple[str, str, bool]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        for canonical, aliases in taxonomy.items():
+            for alias in [canonical, *aliases]:
+                self._add(re.sub(r"\s+", " ", alias).strip(), canonical)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(set(self._canonical.values()))
+
+    def __contains__(self, skill: str) -> bool:
+        return self.canonical(skill) is not None
+
+    def canonical(self, skill: str) -> Optional[str]:
+        """Canonical name of a skill or one of its aliases, or None if it is not in the taxonomy."""
+        return self._canonical.get(normalize_skill(skill))
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical names of the skills mentioned in text, in order of first mention."""
+        text = re.sub(r"\s+", " ", text or "")
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lower-case to more than one; keep positions aligned with the original
+            lowered = "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+        found = []
+        state = 0
+        for end, ch in enumerate(lowered, 1):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pattern in self._output[state]:
+                alias, canonical, case_sensitive = self._patterns[pattern]
+                start = end - len(alias)
+                if not _is_word_boundary(text, start, end):
+                    continue
+                if case_sensitive and text[start:end] != alias:
+                    continue
+                found.append((start, end, canonical))
+
+        skills = []
+        covered = 0
+        for start, end, canonical in sorted(found, key=lambda match: (match[0], match[0] - match[1])):
+            if start < covered:
+                continue
+            covered = end
+            if canonical not in skills:
+                skills.append(canonical)
+        return skills
+
+    def needs_llm(self, skills: List[str]) -> bool:
+        """Whether the taxonomy found too few skills for its result to be trusted on its own."""
+        return len(skills) < SKILL_LLM_FALLBACK_MIN_SKILLS
+
+    def merge(self, skills: List[str], extra: Iterable[str]) -> List[str]:
+        """Append the extra (model-extracted) skills not already present, using canonical names where known."""
+        merged = list(skills)
+        seen = {normalize_skill(skill) for skill in merged}
+        for skill in extra:
+            skill = self.canonical(skill) or skill.strip()
+            if skill and normalize_skill(skill) not in seen:
+                seen.add(normalize_skill(skill))
+                merged.append(skill)
+        return merged
+
+    def _add(self, alias: str, canonical: str):
+        if not alias:
+            return
+        self._canonical.setdefault(normalize_skill(alias), canonical)
+        case_sensitive = len(alias) <= CASE_SENSITIVE_MAX_LENGTH
+        pattern = (alias if case_sensitive else alias.lower(), canonical, case_sensitive)
+        if pattern in self._patterns:
+            return
+        state = 0
+        for ch in alias.lower():
+            if ch not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][ch] = len(self._goto) - 1
+            state = self._goto[state][ch]
+        self._output[state].append(len(self._patterns))
+        self._patterns.append(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._output[child].extend(self._output[self._fail[child]])
+
+    @classmethod
+    def load(cls, path: str = SKILL_TAXONOMY_PATH) -> "SkillTaxonomy":
+        """The built-in taxonomy, extended or overridden by the JSON file at path if one is given."""
+        taxonomy = dict(DEFAULT_TAXONOMY)
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    taxonomy.update(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not load skill taxonomy from {path}: {str(e)}")
+        return cls(taxonomy)
+
+def canonical_skill_key(skill: str) -> str:
+    """Normalized canonical name of a skill, so aliases such as "React.js" and "React" share one key."""
+    return normalize_skill(skill_taxonomy.canonical(skill) or skill)
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    # "+" and "#" continue a word so "C" is not found in "C++" or "C#"
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not (after.isalnum() or after in "+#")
+
+skill_taxonomy = SkillTaxonomy.load()
@@ -0,0 +1,21 @@
+import os
+import sqlite3
+
+# Same setting as the main database: how long to wait for another process's write to finish
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open a SQLite file shared by the API process and screening workers.
+
+    WAL lets readers run while another process writes, and the busy timeout
+    makes concurrent writers wait for each other instead of failing with
+    "database is locked".
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    return conn
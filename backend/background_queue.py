@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class BackgroundQueue:
+    """Deduplicating asyncio queue drained by a single background task.
+
+    Subclasses implement ``_handle(items)``, which receives up to
+    ``batch_size`` queued items at a time; an item already waiting in the
+    queue is not added again. Errors raised by ``_handle`` are logged and the
+    worker moves on. ``session_factory`` must produce async sessions.
+    """
+
+    name = "Background queue"
+
+    def __init__(self, session_factory, batch_size: int = 1):
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued = set()
+        self._worker: Optional[asyncio.Task] = None
+        self.processed = 0
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._queued.clear()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"{self.name} started")
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._worker is not None and not self._worker.done(),
+            "queued": len(self._queued),
+            "processed": self.processed
+        }
+
+    def _enqueue(self, item: Hashable):
+        if self._queue is None:
+            logger.warning(f"{self.name} not started, dropping {item}")
+            return
+        # An item already waiting in the queue will be handled with its latest data
+        if item not in self._queued:
+            self._queued.add(item)
+            self._queue.put_nowait(item)
+
+    async def _on_start(self):
+        """Called once in the worker task before the first item is taken."""
+
+    async def _handle(self, items: List):
+        raise NotImplementedError
+
+    async def _run(self):
+        await self._on_start()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self._queued.difference_update(batch)
+            try:
+                await self._handle(batch)
+            except Exception as e:
+                logger.error(f"{self.name} failed on {batch}: {str(e)}")
+                logger.exception("Full traceback:")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
@@ -0,0 +1,70 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+
+def run_writers(db_engine, writers, commits, rows_per_commit):
+    """Have each writer thread commit small transactions; return elapsed seconds and the number of failed commits."""
+    from sqlalchemy.orm import sessionmaker
+    import models
+
+    Session = sessionmaker(bind=db_engine)
+    failures = []
+
+    def write(worker):
+        db = Session()
+        try:
+            for commit in range(commits):
+                for row in range(rows_per_commit):
+                    db.add(models.CandidateJobMatch(
+                        candidate_id=worker * commits + commit,
+                        job_id=row + 1,
+                        match_score=0.5,
+                        skill_match_details={"matched_skills": ["Python"]}
+                    ))
+                try:
+                    db.commit()
+                except OperationalError:
+                    db.rollback()
+                    failures.append(1)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, len(failures)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQLite write throughput with and without the tuned pragma profile")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--commits", type=int, default=200)
+    parser.add_argument("--rows-per-commit", type=int, default=5)
+    args = parser.parse_args()
+
+    # Keep statement logging out of the measurement
+    os.environ["SQL_ECHO"] = "0"
+    from database import create_db_engine
+    from migrations import run_migrations
+
+    print(f"{'profile':>8} {'seconds':>10} {'commits/s':>10} {'rows/s':>10} {'failed':>8}")
+    for profile, tuned in [("default", False), ("tuned", True)]:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        db_engine = create_db_engine(f"sqlite:///{path}", echo=False, tuned=tuned)
+        try:
+            run_migrations(db_engine)
+            elapsed, failed = run_writers(db_engine, args.writers, args.commits, args.rows_per_commit)
+        finally:
+            db_engine.dispose()
+
+        commits = args.writers * args.commits - failed
+        print(f"{profile:>8} {elapsed:>10.2f} {commits / elapsed:>10.1f} "
+              f"{commits * args.rows_per_commit / elapsed:>10.1f} {failed:>8}")
+
+if __name__ == "__main__":
+    main()
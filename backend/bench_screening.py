@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+SKILLS = [
+    "Python", "FastAPI", "Django", "SQL", "PostgreSQL", "MongoDB", "React", "TypeScript",
+    "JavaScript", "Node.js", "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform",
+    "PyTorch", "TensorFlow", "NLP", "Computer Vision", "Java", "Go", "Rust", "CI/CD"
+]
+
+def make_data(num_jobs, num_candidates, seed=42):
+    rng = random.Random(seed)
+    jobs = [
+        {
+            "id": i + 1,
+            "title": f"Job {i + 1}",
+            "required_skills": rng.sample(SKILLS, 4),
+            "experience_level": rng.choice(["Entry Level", "Mid Level", "Senior"])
+        }
+        for i in range(num_jobs)
+    ]
+    candidates = [
+        {
+            "id": i + 1,
+            "name": f"Candidate {i + 1}",
+            "skills": rng.sample(SKILLS, 5),
+            "experience": rng.randint(0, 10)
+        }
+        for i in range(num_candidates)
+    ]
+    return jobs, candidates
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sharded screening throughput for different worker counts")
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=32)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--shard-size", type=int, default=8)
+    args = parser.parse_args()
+
+    # Disable the response cache so every configuration does the same model work
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    from screening_engine import ShardedScreeningEngine
+
+    jobs, candidates = make_data(args.jobs, args.candidates)
+    pairs = len(jobs) * len(candidates)
+    print(f"{'workers':>8} {'seconds':>10} {'pairs/s':>10} {'speedup':>8} {'matches':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        # Fresh skill equivalence table per run so no run benefits from an earlier one
+        os.environ["SKILL_EQUIVALENCE_PATH"] = os.path.join(tempfile.mkdtemp(), "skill_equivalence.db")
+        engine = ShardedScreeningEngine(workers=workers, shard_size=args.shard_size)
+        try:
+            # Start every worker and load its model before timing
+            list(engine.pool.map(time.sleep, [1.0] * workers))
+            start = time.perf_counter()
+            matches = asyncio.run(engine.screen(jobs, candidates))
+            elapsed = time.perf_counter() - start
+        finally:
+            engine.shutdown()
+
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {pairs / elapsed:>10.2f} {baseline / elapsed:>8.2f} {len(matches):>8}")
+
+if __name__ == "__main__":
+    main()
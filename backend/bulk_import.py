@@ -0,0 +1,116 @@
+import codecs
+import csv
+import json
+import os
+from typing import AsyncIterator, Dict, List, Tuple, Union
+
+# Candidates inserted per transaction by the bulk import endpoint
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "1000"))
+
+REQUIRED_CANDIDATE_FIELDS = ("name", "email", "resume")
+
+def detect_format(content_type: str) -> str:
+    """Pick csv or jsonl from a request Content-Type, defaulting to jsonl."""
+    return "csv" if "csv" in (content_type or "").lower() else "jsonl"
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a stream of UTF-8 byte chunks into lines, keeping their line endings.
+
+    Only the current partial line is buffered, so memory use does not grow
+    with the size of the upload. A leading byte order mark is dropped.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+async def iter_records(
+    chunks: AsyncIterator[bytes],
+    format: str
+) -> AsyncIterator[Tuple[int, Union[Dict, ValueError]]]:
+    """Yield (row number, record) for each CSV or JSONL row as soon as it has been received.
+
+    Rows that cannot be parsed are yielded as a ValueError instead of a dict
+    so one bad row does not abort the import. Row numbers start at 1 and do
+    not count the CSV header or blank lines.
+    """
+    lines = iter_lines(chunks)
+    if format == "csv":
+        async for row_number, record in _iter_csv_records(lines):
+            yield row_number, record
+    else:
+        row_number = 0
+        async for line in lines:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("row is not a JSON object")
+                yield row_number, record
+            except ValueError as e:
+                yield row_number, ValueError(f"invalid JSON: {e}")
+
+async def _iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Union[Dict, ValueError]]]:
+    header = None
+    row_number = 0
+    record_text = ""
+    async for line in lines:
+        record_text += line
+        # A quoted field may contain newlines; wait until every quote is closed
+        if record_text.count('"') % 2:
+            continue
+        text, record_text = record_text, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, ValueError(f"expected {len(header)} columns, got {len(values)}")
+        else:
+            yield row_number, dict(zip(header, values))
+    if record_text.strip():
+        yield row_number + 1, ValueError("unterminated quoted field")
+
+def parse_skills(value) -> List[str]:
+    """Accept a list of skills or a string separated by semicolons or commas."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return [str(skill).strip() for skill in value if str(skill).strip()]
+    value = str(value)
+    separator = ";" if ";" in value else ","
+    return [skill.strip() for skill in value.split(separator) if skill.strip()]
+
+def candidate_fields(record: Dict) -> Dict:
+    """Validate one imported record and return the Candidate column values, raising ValueError if invalid."""
+    missing = [field for field in REQUIRED_CANDIDATE_FIELDS if not str(record.get(field) or "").strip()]
+    if missing:
+        raise ValueError(f"missing required field(s): {', '.join(missing)}")
+
+    experience = record.get("experience")
+    if experience in (None, ""):
+        experience = None
+    else:
+        try:
+            experience = int(experience)
+        except (TypeError, ValueError):
+            raise ValueError(f"experience must be an integer, got {experience!r}")
+
+    return {
+        "name": str(record["name"]).strip(),
+        "email": str(record["email"]).strip(),
+        "resume": str(record["resume"]),
+        "skills": parse_skills(record.get("skills")),
+        "experience": experience
+    }
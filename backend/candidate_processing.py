@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Iterable, List
+from sqlalchemy import select
+import models
+from background_queue import BackgroundQueue
+from models import PENDING, PROCESSING, COMPLETED, FAILED
+from agents.candidate_agent import estimate_experience_years
+
+logger = logging.getLogger(__name__)
+
+# Candidates whose resumes are run through the extraction prompts together
+CANDIDATE_PROCESSING_BATCH_SIZE = int(os.getenv("CANDIDATE_PROCESSING_BATCH_SIZE", "16"))
+
+class CandidateProcessor(BackgroundQueue):
+    """Background queue that fills in resume-derived fields for candidates stored as pending.
+
+    Queued candidates are taken off in batches of up to ``batch_size``, and
+    their resumes go through skill extraction and experience analysis as
+    batched model calls. Experience supplied with the candidate is kept.
+    Finished candidates are added to the skill index and handed to the
+    incremental screener.
+    """
+
+    name = "Candidate processor"
+
+    def __init__(
+        self,
+        agent,
+        session_factory,
+        skill_index=None,
+        screener=None,
+        batch_size: int = CANDIDATE_PROCESSING_BATCH_SIZE
+    ):
+        super().__init__(session_factory, batch_size)
+        self.agent = agent
+        self.skill_index = skill_index
+        self.screener = screener
+        self.failed = 0
+
+    def enqueue(self, candidate_ids: Iterable[int]):
+        for candidate_id in candidate_ids:
+            self._enqueue(candidate_id)
+
+    def stats(self) -> Dict:
+        return dict(super().stats(), failed=self.failed)
+
+    async def _on_start(self):
+        """Queue candidates left pending by a previous run of the server."""
+        async with self.session_factory() as db:
+            unfinished = (await db.execute(
+                select(models.Candidate.id).where(models.Candidate.processing_status.in_([PENDING, PROCESSING]))
+            )).scalars().all()
+        self.enqueue(unfinished)
+        if unfinished:
+            logger.info(f"Resuming processing of {len(unfinished)} candidates")
+
+    async def _handle(self, items: List[int]):
+        await self._process(items)
+
+    async def _process(self, candidate_ids: List[int]):
+        async with self.session_factory() as db:
+            try:
+                candidates = (await db.execute(
+                    select(models.Candidate).where(
+                        models.Candidate.id.in_(candidate_ids),
+                        models.Candidate.processing_status.in_([PENDING, PROCESSING])
+                    )
+                )).scalars().all()
+                if not candidates:
+                    return
+                for candidate in candidates:
+                    candidate.processing_status = PROCESSING
+                await db.commit()
+
+                resumes = [candidate.resume for candidate in candidates]
+                try:
+                    skills, analyses = await asyncio.gather(
+                        self.agent.extract_skills_batch(resumes),
+                        self.agent.analyze_candidates_batch(resumes)
+                    )
+                except Exception as e:
+                    for candidate in candidates:
+                        candidate.processing_status = FAILED
+                        candidate.processing_error = str(e)
+                    await db.commit()
+                    self.failed += len(candidates)
+                    raise
+
+                for candidate, candidate_skills, analysis in zip(candidates, skills, analyses):
+                    candidate.skills = candidate_skills
+                    if candidate.experience is None:
+                        candidate.experience = estimate_experience_years(candidate.resume, analysis["experience_level"])
+                    candidate.processing_status = COMPLETED
+                    candidate.processing_error = None
+                await db.commit()
+                self.processed += len(candidates)
+                logger.info(f"Extracted skills and experience for {len(candidates)} candidates")
+
+            except Exception:
+                await db.rollback()
+                raise
+
+        if self.skill_index is not None:
+            for candidate in candidates:
+                self.skill_index.add_candidate(candidate.id, candidate.skills)
+        if self.screener is not None:
+            self.screener.enqueue_candidates([candidate.id for candidate in candidates])
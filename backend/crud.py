@@ -0,0 +1,218 @@
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, Query, joinedload, selectinload
+import models
+from agents.skill_taxonomy import canonical_skill_key
+
+# Matches scoring at least this much count as successful on the dashboard
+SUCCESSFUL_MATCH_SCORE = 0.7
+# Read dashboard counters from the trigger-maintained match_stats table instead of aggregating
+DASHBOARD_STATS_TABLE = os.getenv("DASHBOARD_STATS_TABLE", "1") == "1"
+
+# Dialect-specific INSERT constructs that support ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+def top_candidates_for_job(db: Session, job_id: int, k: int) -> List[models.CandidateJobMatch]:
+    """The k best stored matches for a job, highest score first."""
+    return (
+        db.query(models.CandidateJobMatch)
+        .options(joinedload(models.CandidateJobMatch.candidate))
+        .filter(models.CandidateJobMatch.job_id == job_id)
+        .order_by(models.CandidateJobMatch.match_score.desc())
+        .limit(k)
+        .all()
+    )
+
+def top_jobs_for_candidate(db: Session, candidate_id: int, k: int) -> List[models.CandidateJobMatch]:
+    """The k best stored matches for a candidate, highest score first."""
+    return (
+        db.query(models.CandidateJobMatch)
+        .options(joinedload(models.CandidateJobMatch.job))
+        .filter(models.CandidateJobMatch.candidate_id == candidate_id)
+        .order_by(models.CandidateJobMatch.match_score.desc())
+        .limit(k)
+        .all()
+    )
+
+def upsert_match(
+    db: Session,
+    candidate_id: int,
+    job_id: int,
+    match_score: float,
+    skill_match_details=None,
+    interview_questions=None
+):
+    """Insert the match for a candidate-job pair, or overwrite the existing one, in a single statement."""
+    values = {
+        "candidate_id": candidate_id,
+        "job_id": job_id,
+        "match_score": match_score,
+        "skill_match_details": skill_match_details,
+        "interview_questions": interview_questions,
+        "created_at": datetime.utcnow()
+    }
+    statement = _UPSERT_INSERTS[db.get_bind().dialect.name](models.CandidateJobMatch).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=["candidate_id", "job_id"],
+        set_={key: statement.excluded[key] for key in values if key not in ("candidate_id", "job_id")}
+    )
+    db.execute(statement)
+
+def get_match(db: Session, candidate_id: int, job_id: int) -> Optional[models.CandidateJobMatch]:
+    return db.query(models.CandidateJobMatch).filter(
+        models.CandidateJobMatch.candidate_id == candidate_id,
+        models.CandidateJobMatch.job_id == job_id
+    ).first()
+
+def paginate(query: Query, id_column, limit: int, after: Optional[int] = None) -> Tuple[List, Optional[int]]:
+    """Return up to limit rows with id greater than after, in id order, and the cursor for the next page.
+
+    Keyset pagination: each page is an index range scan on the primary key,
+    so its cost does not depend on how deep into the table it starts. The
+    cursor is None on the last page.
+    """
+    if after is not None:
+        query = query.filter(id_column > after)
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
+
+def _created_between(query: Query, created_column, created_after: Optional[datetime], created_before: Optional[datetime]) -> Query:
+    if created_after is not None:
+        query = query.filter(created_column >= created_after)
+    if created_before is not None:
+        query = query.filter(created_column < created_before)
+    return query
+
+def filter_jobs(
+    db: Session,
+    skills: Optional[List[str]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+) -> Query:
+    """Jobs requiring all of skills (when given) created in [created_after, created_before)."""
+    query = jobs_requiring_skills(db, skills) if skills else db.query(models.Job)
+    return _created_between(query, models.Job.created_at, created_after, created_before)
+
+def filter_candidates(
+    db: Session,
+    skills: Optional[List[str]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+) -> Query:
+    """Candidates listing all of skills (when given) created in [created_after, created_before)."""
+    query = candidates_with_skills(db, skills) if skills else db.query(models.Candidate)
+    return _created_between(query, models.Candidate.created_at, created_after, created_before)
+
+def filter_matches(
+    db: Session,
+    job_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    min_score: Optional[float] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+) -> Query:
+    """Matches, with related rows loaded in bulk, narrowed by the given filters."""
+    query = matches_with_related(db)
+    if job_id is not None:
+        query = query.filter(models.CandidateJobMatch.job_id == job_id)
+    if candidate_id is not None:
+        query = query.filter(models.CandidateJobMatch.candidate_id == candidate_id)
+    if min_score is not None:
+        query = query.filter(models.CandidateJobMatch.match_score >= min_score)
+    return _created_between(query, models.CandidateJobMatch.created_at, created_after, created_before)
+
+def matches_with_related(db: Session) -> Query:
+    """All matches with their candidates and jobs loaded in two extra SELECTs, not two per row."""
+    return db.query(models.CandidateJobMatch).options(
+        selectinload(models.CandidateJobMatch.candidate),
+        selectinload(models.CandidateJobMatch.job)
+    )
+
+def interviews_with_related(db: Session) -> Query:
+    """All interviews with their candidates and jobs loaded in bulk."""
+    return db.query(models.Interview).options(
+        selectinload(models.Interview.candidate),
+        selectinload(models.Interview.job)
+    )
+
+def serialize_with_related(rows) -> List[Dict]:
+    """to_dict() each match or interview, serializing every distinct candidate and job once.
+
+    Rows pointing at the same candidate or job share one dict in the output.
+    """
+    candidates: Dict[int, Dict] = {}
+    jobs: Dict[int, Dict] = {}
+    serialized = []
+    for row in rows:
+        data = row.to_dict(include_related=False)
+        candidate, job = row.candidate, row.job
+        if candidate is not None and candidate.id not in candidates:
+            candidates[candidate.id] = candidate.to_dict()
+        if job is not None and job.id not in jobs:
+            jobs[job.id] = job.to_dict()
+        data["candidate"] = candidates[candidate.id] if candidate is not None else None
+        data["job"] = jobs[job.id] if job is not None else None
+        serialized.append(data)
+    return serialized
+
+def _canonical(skills: List[str]) -> List[str]:
+    return sorted({canonical_skill_key(skill) for skill in skills if canonical_skill_key(skill)})
+
+def candidates_with_skills(db: Session, skills: List[str], match_all: bool = True) -> Query:
+    """Candidates having all (or any) of the given skills, resolved entirely in SQL."""
+    canonical = _canonical(skills)
+    matching = (
+        db.query(models.CandidateSkill.candidate_id)
+        .join(models.Skill, models.Skill.id == models.CandidateSkill.skill_id)
+        .filter(models.Skill.canonical_name.in_(canonical))
+        .group_by(models.CandidateSkill.candidate_id)
+    )
+    if match_all:
+        matching = matching.having(func.count(func.distinct(models.CandidateSkill.skill_id)) == len(canonical))
+    return db.query(models.Candidate).filter(models.Candidate.id.in_(matching.subquery().select()))
+
+def jobs_requiring_skills(db: Session, skills: List[str], match_all: bool = True) -> Query:
+    """Jobs requiring all (or any) of the given skills, resolved entirely in SQL."""
+    canonical = _canonical(skills)
+    matching = (
+        db.query(models.JobSkill.job_id)
+        .join(models.Skill, models.Skill.id == models.JobSkill.skill_id)
+        .filter(models.Skill.canonical_name.in_(canonical))
+        .group_by(models.JobSkill.job_id)
+    )
+    if match_all:
+        matching = matching.having(func.count(func.distinct(models.JobSkill.skill_id)) == len(canonical))
+    return db.query(models.Job).filter(models.Job.id.in_(matching.subquery().select()))
+
+def aggregate_match_stats(db: Session) -> Dict[str, int]:
+    """Count matches, successful matches and distinct matched candidates in one aggregate query."""
+    total, successful, screened = db.query(
+        func.count(models.CandidateJobMatch.id),
+        func.count(case((models.CandidateJobMatch.match_score >= SUCCESSFUL_MATCH_SCORE, 1))),
+        func.count(func.distinct(models.CandidateJobMatch.candidate_id))
+    ).one()
+    return {
+        "total_matches": total,
+        "successful_matches": successful,
+        "screened_candidates": screened
+    }
+
+def match_stats(db: Session) -> Dict[str, int]:
+    """Dashboard match counters, read from match_stats when it is maintained."""
+    if DASHBOARD_STATS_TABLE:
+        row = db.query(models.MatchStats).filter(models.MatchStats.id == 1).first()
+        if row is not None:
+            return {
+                "total_matches": row.total_matches,
+                "successful_matches": row.successful_matches,
+                "screened_candidates": row.screened_candidates
+            }
+    return aggregate_match_stats(db)
@@ -1,22 +1,98 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
 
 # Create database directory if it doesn't exist
 os.makedirs("./data", exist_ok=True)
 
-# Use absolute path for SQLite database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./data/recruitment.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/recruitment.db")
+# Log every SQL statement; useful when debugging, far too noisy in production
+SQL_ECHO = os.getenv("SQL_ECHO", "0") == "1"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False},
-    echo=True  # Enable SQL logging
-)
+# Connection pool sizing
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# SQLite profile applied to every new connection
+SQLITE_TUNED = os.getenv("SQLITE_TUNED", "1") == "1"
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers run alongside the writer; NORMAL skips the fsync on every commit
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    # A negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    # Wait for a competing writer to finish instead of failing with "database is locked"
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+# Async drivers used by the request-handling engine, by database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    """Rewrite a database URL to use the backend's async driver, e.g. sqlite:// to sqlite+aiosqlite://."""
+    scheme, rest = url.split(":", 1)
+    backend = scheme.split("+")[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported database backend {backend!r}; DATABASE_URL must use one of {sorted(ASYNC_DRIVERS)}")
+    return ASYNC_DRIVERS[backend] + ":" + rest
+
+def _engine_options(url: str, echo: bool, queue_pool) -> dict:
+    options = {"echo": echo}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+        if not _is_memory_sqlite(url):
+            # Keep connections open so the pragmas are applied once per connection, not per checkout
+            options.update(poolclass=queue_pool, pool_size=DB_POOL_SIZE,
+                           max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    else:
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                       pool_timeout=DB_POOL_TIMEOUT, pool_pre_ping=True)
+    return options
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.split(":", 1)[1] in ("//", "///:memory:")
+
+def _use_sqlite_profile(url: str, tuned: bool) -> bool:
+    return url.startswith("sqlite") and tuned and not _is_memory_sqlite(url)
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL, echo: bool = SQL_ECHO, tuned: bool = SQLITE_TUNED) -> Engine:
+    """Build an engine for url with pooled connections and, for SQLite files, the tuned pragma profile."""
+    db_engine = create_engine(url, **_engine_options(url, echo, QueuePool))
+    if _use_sqlite_profile(url, tuned):
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+def create_async_db_engine(url: str = SQLALCHEMY_DATABASE_URL, echo: bool = SQL_ECHO, tuned: bool = SQLITE_TUNED) -> AsyncEngine:
+    """Async counterpart of create_db_engine, used by the API endpoints."""
+    async_url = async_database_url(url)
+    db_engine = create_async_engine(async_url, **_engine_options(async_url, echo, AsyncAdaptedQueuePool))
+    if _use_sqlite_profile(async_url, tuned):
+        event.listen(db_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Endpoints use async sessions so waiting on the database does not block the event loop.
+# Objects stay loaded after commit because lazy loading is not available outside the session.
+async_engine = create_async_db_engine()
+AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
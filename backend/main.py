@@ -1,14 +1,30 @@
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Query, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import asyncio
 import logging
 import json
-from database import SessionLocal, engine, Base
+from database import SessionLocal, AsyncSessionLocal, engine, async_engine
 import models
-from agents.screening_agent import AutoScreeningAgent
-from schemas import JobCreate, Job, CandidateJobMatchBase, InterviewResponse, CandidateBase
+import crud
+from migrations import run_migrations
+from agents.screening_agent import AutoScreeningAgent, load_skill_equivalence
+from agents.candidate_agent import CandidateScreeningAgent
+from agents.model_registry import model_registry
+from agents.base_agent import batching_stats, get_storage_executor
+from agents.llm_cache import llm_cache
+from screening_service import ScreeningRunManager, IncrementalScreener
+from skill_index import SkillIndex
+from screening_engine import ShardedScreeningEngine, SCREENING_WORKERS
+from candidate_processing import CandidateProcessor
+from models import PENDING, COMPLETED
+import bulk_import
+from schemas import JobCreate, JobUpdate, Job, CandidateJobMatchBase, InterviewResponse, CandidateBase, CandidateUpdate
 
 # Configure logging
 logging.basicConfig(
@@ -17,8 +33,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create tables and any indexes missing from existing ones
+run_migrations(engine)
 
 app = FastAPI(title="AI Recruitment System")
 
@@ -29,18 +45,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Page size bounds for the list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Largest number of job descriptions accepted by POST /jobs/bulk
+MAX_BULK_JOBS = 500
+
+def set_next_cursor(response: Response, next_cursor: Optional[int]):
+    """Expose the keyset cursor for the following page, if there is one."""
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+
 # Initialize agents
 screening_agent = AutoScreeningAgent()
+skill_index = SkillIndex()
+screening_engine = ShardedScreeningEngine() if SCREENING_WORKERS > 1 else None
+screening_runs = ScreeningRunManager(screening_agent, AsyncSessionLocal, skill_index=skill_index, engine=screening_engine)
+incremental_screener = IncrementalScreener(screening_agent, AsyncSessionLocal, skill_index=skill_index)
+candidate_agent = CandidateScreeningAgent()
+candidate_processor = CandidateProcessor(candidate_agent, AsyncSessionLocal, skill_index=skill_index, screener=incremental_screener)
 
 # Database dependency
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Create sample data
 def create_sample_data(db: Session):
@@ -126,50 +157,55 @@ async def startup_event():
     db = SessionLocal()
     try:
         create_sample_data(db)
+        skill_index.rebuild(
+            {"id": candidate_id, "skills": skills}
+            for candidate_id, skills in db.query(models.Candidate.id, models.Candidate.skills)
+        )
     finally:
         db.close()
+    await load_skill_equivalence()
+    incremental_screener.start()
+    candidate_processor.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await candidate_processor.stop()
+    await incremental_screener.stop()
+    if screening_engine:
+        screening_engine.shutdown()
+    llm_cache.flush()
+    await async_engine.dispose()
 
 @app.get("/")
 async def root():
     return {"status": "ok", "message": "AI Recruitment System API"}
 
 @app.get("/dashboard")
-async def get_dashboard_data(db: Session = Depends(get_db)):
+async def get_dashboard_data(db: AsyncSession = Depends(get_db)):
     """Get dynamic dashboard data."""
     try:
-        # Get total candidates
-        total_candidates = db.query(models.Candidate).count()
-        logger.info(f"Total candidates: {total_candidates}")
-        
-        # Get total active jobs
-        active_jobs = db.query(models.Job).count()
-        logger.info(f"Active jobs: {active_jobs}")
-        
-        # Get all matches and calculate successful matches
-        matches = db.query(models.CandidateJobMatch).all()
-        total_matches = len(matches)
-        successful_matches = sum(1 for match in matches if match.match_score and match.match_score >= 0.7)
+        # Get total candidates and active jobs
+        total_candidates = await db.scalar(select(func.count(models.Candidate.id)))
+        active_jobs = await db.scalar(select(func.count(models.Job.id)))
         
-        logger.info(f"Total matches: {total_matches}")
-        logger.info(f"Successful matches: {successful_matches}")
+        # Match counters come from the maintained stats table, or one aggregate query
+        stats = await db.run_sync(crud.match_stats)
         
         # Calculate screening rate
-        candidates_with_matches = len(set(match.candidate_id for match in matches))
-        screening_rate = (candidates_with_matches / total_candidates * 100) if total_candidates > 0 else 0
-        logger.info(f"Screening rate: {screening_rate}%")
+        screening_rate = (stats["screened_candidates"] / total_candidates * 100) if total_candidates > 0 else 0
         
         # Prepare response data
         response_data = {
             "stats": {
                 "activeJobs": active_jobs,
                 "candidates": total_candidates,
-                "total_matches": total_matches,
-                "successful_matches": successful_matches,
+                "total_matches": stats["total_matches"],
+                "successful_matches": stats["successful_matches"],
                 "screening_rate": round(screening_rate, 1)
             }
         }
         
-        logger.info(f"Dashboard response: {json.dumps(response_data)}")
+        logger.debug(f"Dashboard stats: {response_data['stats']}")
         return response_data
         
     except Exception as e:
@@ -178,43 +214,79 @@ async def get_dashboard_data(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/debug/data")
-async def get_debug_data(db: Session = Depends(get_db)):
+async def get_debug_data(db: AsyncSession = Depends(get_db)):
     """Endpoint for debugging database contents"""
     try:
-        jobs = db.query(models.Job).all()
-        candidates = db.query(models.Candidate).all()
-        interviews = db.query(models.Interview).all()
+        jobs = (await db.execute(select(models.Job))).scalars().all()
+        candidates = (await db.execute(select(models.Candidate))).scalars().all()
+        interviews = await db.run_sync(
+            lambda session: crud.serialize_with_related(crud.interviews_with_related(session).all())
+        )
         
         return {
             "jobs": [job.to_dict() for job in jobs],
             "candidates": [candidate.to_dict() for candidate in candidates],
-            "interviews": [interview.to_dict() for interview in interviews]
+            "interviews": interviews
         }
     except Exception as e:
         logger.error(f"Error fetching debug data: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/debug/status")
-async def get_debug_status(db: Session = Depends(get_db)):
+async def get_debug_status(db: AsyncSession = Depends(get_db)):
     """Get debug information about the current database state."""
     try:
-        jobs = db.query(models.Job).all()
-        candidates = db.query(models.Candidate).all()
-        matches = db.query(models.CandidateJobMatch).all()
+        jobs = (await db.execute(select(models.Job))).scalars().all()
+        candidates = (await db.execute(select(models.Candidate))).scalars().all()
+        matches_count = await db.scalar(select(func.count(models.CandidateJobMatch.id)))
         
         return {
             "jobs_count": len(jobs),
             "jobs": [{"id": j.id, "title": j.title, "skills": j.required_skills} for j in jobs],
             "candidates_count": len(candidates),
             "candidates": [{"id": c.id, "name": c.name, "skills": c.skills} for c in candidates],
-            "matches_count": len(matches)
+            "matches_count": matches_count
         }
     except Exception as e:
         logger.error(f"Error in debug status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/debug/models")
+async def get_debug_models():
+    """Report the models loaded in this process, the memory they use and how their prompts are batched."""
+    try:
+        usage = model_registry.memory_usage()
+        batching = batching_stats()
+        for key, model in usage.items():
+            model["batching"] = batching.get(key)
+        return usage
+    except Exception as e:
+        logger.error(f"Error in debug models: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/debug/llm_cache")
+async def get_llm_cache_stats():
+    """Report LLM response cache size and hit/miss counters."""
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_storage_executor(), llm_cache.stats)
+    except Exception as e:
+        logger.error(f"Error in LLM cache stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.delete("/debug/llm_cache")
+async def invalidate_llm_cache(model_name: Optional[str] = None):
+    """Invalidate cached LLM responses, optionally only for one model."""
+    try:
+        removed = await asyncio.get_running_loop().run_in_executor(
+            get_storage_executor(), llm_cache.invalidate, model_name
+        )
+        return {"message": "LLM cache invalidated", "removed": removed}
+    except Exception as e:
+        logger.error(f"Error invalidating LLM cache: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/jobs")
-async def create_job(job: JobCreate, db: Session = Depends(get_db)):
+async def create_job(job: JobCreate, db: AsyncSession = Depends(get_db)):
     try:
         logger.info(f"Processing job: {job.title}")
         
@@ -234,63 +306,206 @@ async def create_job(job: JobCreate, db: Session = Depends(get_db)):
         # Add and commit with error handling
         try:
             db.add(db_job)
-            db.commit()
-            db.refresh(db_job)
+            await db.commit()
+            await db.refresh(db_job)
             logger.info(f"Job created successfully: {db_job.id}")
+            incremental_screener.enqueue_job(db_job.id)
             return db_job
         except Exception as db_error:
             logger.error(f"Database error: {str(db_error)}")
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=500, detail="Failed to save job to database")
         
     except Exception as e:
         logger.error(f"Error creating job: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/jobs/bulk")
+async def bulk_create_jobs(jobs: List[JobCreate], db: AsyncSession = Depends(get_db)):
+    """Create many jobs at once.
+
+    The skill and experience-level prompts of every description run as one
+    batched inference call, and all jobs are stored in a single transaction.
+    """
+    if len(jobs) > MAX_BULK_JOBS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_JOBS} jobs per request")
+    try:
+        logger.info(f"Processing {len(jobs)} jobs in bulk")
+        processed_jobs = await screening_agent.process_full_descriptions(
+            [(job.title, job.description) for job in jobs]
+        )
+        
+        db_jobs = [
+            models.Job(
+                title=job.title,
+                description=job.description,
+                standardized_role=processed_job.get("standardized_role", ""),
+                required_skills=processed_job.get("required_skills", []),
+                created_at=datetime.utcnow()
+            )
+            for job, processed_job in zip(jobs, processed_jobs)
+        ]
+        db.add_all(db_jobs)
+        try:
+            await db.commit()
+        except Exception as db_error:
+            logger.error(f"Database error: {str(db_error)}")
+            await db.rollback()
+            raise HTTPException(status_code=500, detail="Failed to save jobs to database")
+        
+        results = []
+        for index, (db_job, processed_job) in enumerate(zip(db_jobs, processed_jobs)):
+            incremental_screener.enqueue_job(db_job.id)
+            results.append({
+                "index": index,
+                "status": "created",
+                "job": db_job.to_dict(),
+                "experience_level": processed_job.get("experience_level")
+            })
+        logger.info(f"Created {len(db_jobs)} jobs in bulk")
+        return {"created": len(db_jobs), "results": results}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating jobs in bulk: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/jobs", response_model=List[Job])
-async def get_jobs(db: Session = Depends(get_db)):
+async def get_jobs(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    skill: Optional[List[str]] = Query(None),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """List jobs in id order, one page at a time.
+
+    Pass the ``X-Next-Cursor`` response header back as ``after`` to get the
+    next page; the header is absent on the last page.
+    """
     try:
-        jobs = db.query(models.Job).all()
+        jobs, next_cursor = await db.run_sync(lambda session: crud.paginate(
+            crud.filter_jobs(session, skill, created_after, created_before), models.Job.id, limit, after
+        ))
+        set_next_cursor(response, next_cursor)
         logger.info(f"Retrieved {len(jobs)} jobs")
         return jobs
     except Exception as e:
         logger.error(f"Error retrieving jobs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.put("/jobs/{job_id}")
+async def update_job(job_id: int, job_update: JobUpdate, db: AsyncSession = Depends(get_db)):
+    """Update a job and re-screen its pairs if its requirements changed."""
+    try:
+        job = await db.get(models.Job, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        description_changed = job_update.description is not None and job_update.description != job.description
+        if job_update.title is not None:
+            job.title = job_update.title
+        if description_changed:
+            job.description = job_update.description
+            # Re-extract skills unless the caller supplied them explicitly
+            if job_update.required_skills is None:
+                processed_job = await screening_agent.process_full_description(job.title, job.description)
+                job.required_skills = processed_job.get("required_skills", [])
+        
+        skills_changed = job_update.required_skills is not None and job_update.required_skills != job.required_skills
+        if skills_changed:
+            job.required_skills = job_update.required_skills
+        
+        await db.commit()
+        await db.refresh(job)
+        
+        if description_changed or skills_changed:
+            incremental_screener.enqueue_job(job.id)
+        
+        logger.info(f"Job updated successfully: {job.id}")
+        return job
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating job {job_id}: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/jobs/search", response_model=List[Job])
+async def search_jobs(
+    skills: List[str] = Query(...),
+    match: str = Query("all", regex="^(all|any)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Find jobs requiring all (or any) of the given skills."""
+    try:
+        return await db.run_sync(
+            lambda session: crud.jobs_requiring_skills(session, skills, match_all=match == "all").all()
+        )
+    except Exception as e:
+        logger.error(f"Error searching jobs by skills: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/jobs/{job_id}/top_candidates")
+async def get_top_candidates(job_id: int, k: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_db)):
+    """Get the k best-matching candidates for a job."""
+    try:
+        if await db.scalar(select(models.Job.id).where(models.Job.id == job_id)) is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        matches = await db.run_sync(crud.top_candidates_for_job, job_id, k)
+        return [
+            {
+                "match_id": match.id,
+                "match_score": match.match_score,
+                "skill_match_details": match.skill_match_details,
+                "candidate": match.candidate.to_dict() if match.candidate else None
+            }
+            for match in matches
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving top candidates for job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.delete("/jobs/{job_id}")
-async def delete_job(job_id: int, db: Session = Depends(get_db)):
+async def delete_job(job_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a job by ID."""
     try:
         # Find the job
-        job = db.query(models.Job).filter(models.Job.id == job_id).first()
+        job = await db.get(models.Job, job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
         # Delete any associated matches
-        db.query(models.CandidateJobMatch).filter(models.CandidateJobMatch.job_id == job_id).delete()
+        await db.execute(delete(models.CandidateJobMatch).where(models.CandidateJobMatch.job_id == job_id))
         
         # Delete any associated interviews
-        db.query(models.Interview).filter(models.Interview.job_id == job_id).delete()
+        await db.execute(delete(models.Interview).where(models.Interview.job_id == job_id))
         
         # Delete the job
-        db.delete(job)
-        db.commit()
+        await db.delete(job)
+        await db.commit()
         
         return {"message": "Job deleted successfully"}
         
     except Exception as e:
         logger.error(f"Error deleting job {job_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/match_candidate_job")
-async def match_candidate_job(match: CandidateJobMatchBase, db: Session = Depends(get_db)):
+async def match_candidate_job(match: CandidateJobMatchBase, db: AsyncSession = Depends(get_db)):
     try:
         logger.info(f"Received match request: {match}")
         
         # Get candidate and job
-        candidate = db.query(models.Candidate).filter(models.Candidate.id == match.candidate_id).first()
-        job = db.query(models.Job).filter(models.Job.id == match.job_id).first()
+        candidate = await db.get(models.Candidate, match.candidate_id)
+        job = await db.get(models.Job, match.job_id)
         
         logger.info(f"Found candidate: {candidate}, job: {job}")
         
@@ -314,24 +529,22 @@ async def match_candidate_job(match: CandidateJobMatchBase, db: Session = Depend
             "Tell me about a time you had to learn a new technology quickly"
         ]
         
-        # Create match record
-        db_match = models.CandidateJobMatch(
-            candidate_id=match.candidate_id,
-            job_id=match.job_id,
-            match_score=match_score,
+        # Create or refresh the match record for this pair
+        await db.run_sync(
+            crud.upsert_match,
+            match.candidate_id,
+            match.job_id,
+            match_score,
             skill_match_details={"matched_skills": list(skill_match)},
             interview_questions={
                 "technical": technical_questions,
                 "behavioral": behavioral_questions
-            },
-            created_at=datetime.utcnow()
+            }
         )
+        await db.commit()
+        db_match = await db.run_sync(crud.get_match, match.candidate_id, match.job_id)
         
-        db.add(db_match)
-        db.commit()
-        db.refresh(db_match)
-        
-        logger.info(f"Created match record: {db_match.id}")
+        logger.info(f"Stored match record: {db_match.id}")
         return db_match
         
     except Exception as e:
@@ -339,36 +552,52 @@ async def match_candidate_job(match: CandidateJobMatchBase, db: Session = Depend
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/matches")
-async def get_matches(db: Session = Depends(get_db)):
+async def get_matches(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    job_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    min_score: Optional[float] = Query(None, ge=0, le=1),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """List matches in id order, one page at a time (see GET /jobs)."""
     try:
-        matches = db.query(models.CandidateJobMatch).all()
+        def load_page(session: Session):
+            query = crud.filter_matches(session, job_id, candidate_id, min_score, created_after, created_before)
+            matches, next_cursor = crud.paginate(query, models.CandidateJobMatch.id, limit, after)
+            return crud.serialize_with_related(matches), next_cursor
+        
+        matches, next_cursor = await db.run_sync(load_page)
+        set_next_cursor(response, next_cursor)
         logger.info(f"Retrieved {len(matches)} matches")
-        return [match.to_dict() for match in matches]
+        return matches
     except Exception as e:
         logger.error(f"Error retrieving matches: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/candidates")
-async def create_candidate(candidate: CandidateBase, db: Session = Depends(get_db)):
+async def create_candidate(candidate: CandidateBase, db: AsyncSession = Depends(get_db)):
     try:
         logger.info(f"Processing candidate: {candidate.name}")
         
-        # Extract skills from resume using AI
-        skills = ["React.js", "Node.js", "TypeScript", "AWS", "Docker", "MongoDB"]  # Placeholder for AI extraction
-        
-        # Create candidate record
+        # Create candidate record; skills and experience are extracted from the resume in the background
         db_candidate = models.Candidate(
             name=candidate.name,
             email=candidate.email,
             resume=candidate.resume,
-            skills=skills,
-            experience=5,  # Placeholder for AI extraction
+            skills=[],
+            processing_status=PENDING,
             created_at=datetime.utcnow()
         )
         
         db.add(db_candidate)
-        db.commit()
-        db.refresh(db_candidate)
+        await db.commit()
+        await db.refresh(db_candidate)
+        # Indexed and screened once processing completes
+        candidate_processor.enqueue([db_candidate.id])
         
         logger.info(f"Candidate created successfully: {db_candidate.id}")
         return db_candidate
@@ -377,50 +606,242 @@ async def create_candidate(candidate: CandidateBase, db: Session = Depends(get_d
         logger.error(f"Error creating candidate: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/candidates/bulk")
+async def bulk_import_candidates(
+    request: Request,
+    format: Optional[str] = Query(None, regex="^(csv|jsonl)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import candidates from a streamed CSV or JSONL request body.
+
+    Each row needs name, email and resume, and may carry skills (a list, or
+    a semicolon/comma separated string) and experience. Rows are parsed as
+    they arrive and inserted in transactions of ``BULK_INSERT_BATCH_SIZE``.
+    Rows without skills are stored as pending and queued for background
+    skill extraction. The format is taken from ``format`` or the
+    Content-Type header, and the response reports the outcome of every row.
+    """
+    import_format = format or bulk_import.detect_format(request.headers.get("content-type", ""))
+    report: List[Dict[str, Any]] = []
+    batch: List[tuple] = []
+    counts = {"created": 0, "failed": 0, "pending": 0}
+
+    async def flush():
+        db.add_all([candidate for _, candidate in batch])
+        try:
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Bulk import batch failed: {str(e)}")
+            counts["failed"] += len(batch)
+            report.extend({"row": row, "status": "failed", "error": f"database error: {e}"} for row, _ in batch)
+        else:
+            pending_ids, completed_ids = [], []
+            for row, candidate in batch:
+                report.append({"row": row, "status": "created", "id": candidate.id,
+                               "processing_status": candidate.processing_status})
+                if candidate.processing_status == PENDING:
+                    pending_ids.append(candidate.id)
+                else:
+                    skill_index.add_candidate(candidate.id, candidate.skills)
+                    completed_ids.append(candidate.id)
+            counts["created"] += len(batch)
+            counts["pending"] += len(pending_ids)
+            candidate_processor.enqueue(pending_ids)
+            incremental_screener.enqueue_candidates(completed_ids)
+        # Keep the session small however many rows are imported
+        db.expunge_all()
+        batch.clear()
+
+    try:
+        async for row, record in bulk_import.iter_records(request.stream(), import_format):
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                fields = bulk_import.candidate_fields(record)
+            except ValueError as e:
+                counts["failed"] += 1
+                report.append({"row": row, "status": "failed", "error": str(e)})
+                continue
+
+            batch.append((row, models.Candidate(
+                **fields,
+                processing_status=COMPLETED if fields["skills"] else PENDING,
+                created_at=datetime.utcnow()
+            )))
+            if len(batch) >= bulk_import.BULK_INSERT_BATCH_SIZE:
+                await flush()
+        if batch:
+            await flush()
+
+        report.sort(key=lambda entry: entry["row"])
+        logger.info(f"Bulk imported {counts['created']} candidates, {counts['failed']} rows failed")
+        return {
+            "total_rows": len(report),
+            "created": counts["created"],
+            "failed": counts["failed"],
+            "queued_for_extraction": counts["pending"],
+            "rows": report
+        }
+
+    except Exception as e:
+        logger.error(f"Error importing candidates: {str(e)}")
+        logger.exception("Full traceback:")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/candidates")
-async def get_candidates(db: Session = Depends(get_db)):
+async def get_candidates(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    skill: Optional[List[str]] = Query(None),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """List candidates in id order, one page at a time (see GET /jobs)."""
     try:
-        candidates = db.query(models.Candidate).all()
+        candidates, next_cursor = await db.run_sync(lambda session: crud.paginate(
+            crud.filter_candidates(session, skill, created_after, created_before), models.Candidate.id, limit, after
+        ))
+        set_next_cursor(response, next_cursor)
         logger.info(f"Retrieved {len(candidates)} candidates")
         return candidates
     except Exception as e:
         logger.error(f"Error retrieving candidates: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.put("/candidates/{candidate_id}")
+async def update_candidate(candidate_id: int, candidate_update: CandidateUpdate, db: AsyncSession = Depends(get_db)):
+    """Update a candidate and re-screen its pairs if its skills or experience changed."""
+    try:
+        candidate = await db.get(models.Candidate, candidate_id)
+        if not candidate:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        
+        for field in ("name", "email", "resume"):
+            value = getattr(candidate_update, field)
+            if value is not None:
+                setattr(candidate, field, value)
+        
+        skills_changed = candidate_update.skills is not None and candidate_update.skills != candidate.skills
+        experience_changed = candidate_update.experience is not None and candidate_update.experience != candidate.experience
+        if skills_changed:
+            candidate.skills = candidate_update.skills
+        if experience_changed:
+            candidate.experience = candidate_update.experience
+        
+        await db.commit()
+        await db.refresh(candidate)
+        
+        if skills_changed:
+            skill_index.add_candidate(candidate.id, candidate.skills)
+        if skills_changed or experience_changed:
+            incremental_screener.enqueue_candidate(candidate.id)
+        
+        logger.info(f"Candidate updated successfully: {candidate.id}")
+        return candidate
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating candidate {candidate_id}: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/candidates/search")
+async def search_candidates(
+    skills: List[str] = Query(...),
+    match: str = Query("all", regex="^(all|any)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Find candidates having all (or any) of the given skills."""
+    try:
+        return await db.run_sync(
+            lambda session: crud.candidates_with_skills(session, skills, match_all=match == "all").all()
+        )
+    except Exception as e:
+        logger.error(f"Error searching candidates by skills: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/candidates/{candidate_id}/top_jobs")
+async def get_top_jobs(candidate_id: int, k: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_db)):
+    """Get the k best-matching jobs for a candidate."""
+    try:
+        if await db.scalar(select(models.Candidate.id).where(models.Candidate.id == candidate_id)) is None:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        matches = await db.run_sync(crud.top_jobs_for_candidate, candidate_id, k)
+        return [
+            {
+                "match_id": match.id,
+                "match_score": match.match_score,
+                "skill_match_details": match.skill_match_details,
+                "job": match.job.to_dict() if match.job else None
+            }
+            for match in matches
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving top jobs for candidate {candidate_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/candidates/{candidate_id}/status")
+async def get_candidate_status(candidate_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the background processing status of a candidate and the fields extracted so far."""
+    try:
+        candidate = await db.get(models.Candidate, candidate_id)
+        if not candidate:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        return {
+            "id": candidate.id,
+            "processing_status": candidate.processing_status or COMPLETED,
+            "processing_error": candidate.processing_error,
+            "skills": candidate.skills,
+            "experience": candidate.experience,
+            "queue": candidate_processor.stats()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving status of candidate {candidate_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.delete("/candidates/{candidate_id}")
-async def delete_candidate(candidate_id: int, db: Session = Depends(get_db)):
+async def delete_candidate(candidate_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a candidate by ID."""
     try:
         # Find the candidate
-        candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+        candidate = await db.get(models.Candidate, candidate_id)
         if not candidate:
             raise HTTPException(status_code=404, detail="Candidate not found")
         
         # Delete any associated matches
-        db.query(models.CandidateJobMatch).filter(models.CandidateJobMatch.candidate_id == candidate_id).delete()
+        await db.execute(delete(models.CandidateJobMatch).where(models.CandidateJobMatch.candidate_id == candidate_id))
         
         # Delete any associated interviews
-        db.query(models.Interview).filter(models.Interview.candidate_id == candidate_id).delete()
+        await db.execute(delete(models.Interview).where(models.Interview.candidate_id == candidate_id))
         
         # Delete the candidate
-        db.delete(candidate)
-        db.commit()
+        await db.delete(candidate)
+        await db.commit()
+        skill_index.remove_candidate(candidate_id)
         
         return {"message": "Candidate deleted successfully"}
         
     except Exception as e:
         logger.error(f"Error deleting candidate {candidate_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/interview_response")
 async def process_interview_response(
     response: InterviewResponse,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         # Get the interview
-        interview = db.query(models.Interview).filter(models.Interview.id == response.interview_id).first()
+        interview = await db.get(models.Interview, response.interview_id)
         if not interview:
             raise HTTPException(status_code=404, detail="Interview not found")
         
@@ -447,7 +868,7 @@ async def process_interview_response(
         if len(interview.responses) == len(interview.questions.get("technical", [])) + len(interview.questions.get("behavioral", [])):
             interview.status = "Interview Completed"
         
-        db.commit()
+        await db.commit()
         
         return feedback
         
@@ -456,103 +877,75 @@ async def process_interview_response(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/auto_screen")
-async def auto_screen_candidates(db: Session = Depends(get_db)):
-    """Return static screening data for testing."""
+async def auto_screen_candidates():
+    """Start screening every candidate against every job in the background.
+
+    Poll ``/auto_screen/{run_id}`` or stream ``/auto_screen/{run_id}/events`` to follow it.
+    """
     try:
-        logger.info("Returning static screening data")
-        
-        # Static matches data
-        static_matches = [
-            {
-                "id": 1,
-                "job": {
-                    "id": 1,
-                    "title": "Senior Python Developer",
-                    "description": "Looking for an experienced Python developer with FastAPI and React experience",
-                    "required_skills": ["Python", "FastAPI", "React", "SQL"],
-                    "experience_level": "Senior",
-                    "created_at": "2025-04-06T10:00:00"
-                },
-                "candidate": {
-                    "id": 1,
-                    "name": "John Doe",
-                    "email": "john@example.com",
-                    "resume": "Experienced full-stack developer with 5 years of Python and React experience",
-                    "skills": ["Python", "FastAPI", "React", "JavaScript", "SQL"],
-                    "experience": 5,
-                    "created_at": "2025-04-06T10:00:00"
-                },
-                "match_score": 0.85,
-                "skill_match_details": {
-                    "score": 0.9,
-                    "matched_skills": ["Python", "FastAPI", "React", "SQL"],
-                    "missing_skills": []
-                },
-                "interview_questions": {
-                    "technical": [
-                        "Explain FastAPI's dependency injection system",
-                        "How do you handle state management in React?",
-                        "Describe your experience with Python async/await"
-                    ],
-                    "behavioral": [
-                        "Tell me about a challenging project you worked on",
-                        "How do you handle tight deadlines?",
-                        "Describe your approach to learning new technologies"
-                    ]
-                },
-                "created_at": "2025-04-06T10:00:00"
-            },
-            {
-                "id": 2,
-                "job": {
-                    "id": 2,
-                    "title": "Frontend Developer",
-                    "description": "Looking for a React developer with UI/UX experience",
-                    "required_skills": ["React", "JavaScript", "CSS", "TypeScript"],
-                    "experience_level": "Mid Level",
-                    "created_at": "2025-04-06T10:00:00"
-                },
-                "candidate": {
-                    "id": 2,
-                    "name": "Jane Smith",
-                    "email": "jane@example.com",
-                    "resume": "Frontend developer with strong React and UI/UX skills",
-                    "skills": ["React", "JavaScript", "CSS", "HTML", "TypeScript"],
-                    "experience": 3,
-                    "created_at": "2025-04-06T10:00:00"
-                },
-                "match_score": 0.92,
-                "skill_match_details": {
-                    "score": 1.0,
-                    "matched_skills": ["React", "JavaScript", "CSS", "TypeScript"],
-                    "missing_skills": []
-                },
-                "interview_questions": {
-                    "technical": [
-                        "Explain React hooks and their benefits",
-                        "How do you optimize React component performance?",
-                        "Describe your experience with TypeScript"
-                    ],
-                    "behavioral": [
-                        "How do you collaborate with designers?",
-                        "Tell me about a time you improved UI performance",
-                        "How do you stay updated with frontend trends?"
-                    ]
-                },
-                "created_at": "2025-04-06T10:00:00"
-            }
-        ]
-        
-        logger.info(f"Returning {len(static_matches)} static matches")
-        return static_matches
+        run = screening_runs.start()
+        return run.to_dict(include_results=False)
         
     except Exception as e:
-        logger.error(f"Error returning static screening data: {str(e)}")
+        logger.error(f"Error starting auto screening: {str(e)}")
         logger.exception("Full traceback:")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/auto_screen/{run_id}")
+async def get_auto_screen_run(run_id: str):
+    """Get the progress of a screening run, and its results once completed."""
+    run = screening_runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Screening run not found")
+    return run.to_dict()
+
+@app.get("/auto_screen/{run_id}/events")
+async def stream_auto_screen_run(
+    run_id: str,
+    format: str = "ndjson",
+    after: int = Query(0, ge=0),
+    last_event_id: Optional[int] = Header(None)
+):
+    """Stream a screening run's events: each match as it is scored, then one final event.
+
+    ``format=ndjson`` emits one JSON object per line; ``format=sse`` emits
+    Server-Sent Events with ids, so a reconnecting EventSource resumes after
+    ``Last-Event-ID`` (``after`` does the same for NDJSON). The final event
+    is ``summary``, ``error`` or ``cancelled``, and clients should close the
+    stream on it. Once a finished run has nothing left to send the response
+    is 204, which stops EventSource from reconnecting.
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    run = screening_runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Screening run not found")
+    if last_event_id is not None:
+        after = max(after, last_event_id)
+    if run.finished and after >= len(run.events):
+        return Response(status_code=204)
+
+    async def events():
+        async for event_id, event in run.follow(after):
+            payload = json.dumps(event)
+            if format == "sse":
+                yield f"id: {event_id}\nevent: {event['type']}\ndata: {payload}\n\n"
+            else:
+                yield payload + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@app.delete("/auto_screen/{run_id}")
+async def cancel_auto_screen_run(run_id: str):
+    """Cancel a screening run; shards no worker has started yet are dropped."""
+    run = await screening_runs.cancel(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Screening run not found")
+    return run.to_dict(include_results=False)
+
 @app.post("/debug/add_test_data")
-async def add_test_data(db: Session = Depends(get_db)):
+async def add_test_data(db: AsyncSession = Depends(get_db)):
     """Add test job and candidate data."""
     try:
         # Add a test job
@@ -576,9 +969,12 @@ async def add_test_data(db: Session = Depends(get_db)):
         )
         db.add(test_candidate)
         
-        db.commit()
-        db.refresh(test_job)
-        db.refresh(test_candidate)
+        await db.commit()
+        await db.refresh(test_job)
+        await db.refresh(test_candidate)
+        skill_index.add_candidate(test_candidate.id, test_candidate.skills)
+        incremental_screener.enqueue_job(test_job.id)
+        incremental_screener.enqueue_candidate(test_candidate.id)
         
         return {
             "job": test_job.to_dict(),
@@ -0,0 +1,209 @@
+import logging
+from sqlalchemy import select, exists, insert, update, delete, func, inspect, literal
+from sqlalchemy.engine import Engine
+from database import Base
+import models
+
+logger = logging.getLogger(__name__)
+
+def ensure_indexes(engine: Engine):
+    """Create indexes declared on the models that are missing from existing tables.
+
+    ``Base.metadata.create_all`` only creates indexes together with new
+    tables, so indexes added to a model later have to be created here.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def ensure_columns(engine: Engine):
+    """Add nullable columns declared on the models that are missing from existing tables."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} to an existing table")
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+            logger.info(f"Added column {table.name}.{column.name}")
+
+def deduplicate_matches(engine: Engine):
+    """Delete duplicate candidate-job matches, keeping the most recent, before the unique pair index is built."""
+    if any(index["name"] == "uq_candidate_job_matches_pair"
+           for index in inspect(engine).get_indexes(models.CandidateJobMatch.__tablename__)):
+        return
+
+    matches = models.CandidateJobMatch.__table__
+    ranked = select(
+        matches.c.id,
+        func.row_number().over(
+            partition_by=(matches.c.candidate_id, matches.c.job_id),
+            order_by=(matches.c.created_at.desc(), matches.c.id.desc())
+        ).label("rank")
+    ).subquery()
+    with engine.begin() as connection:
+        removed = connection.execute(
+            delete(matches).where(matches.c.id.in_(select(ranked.c.id).where(ranked.c.rank > 1)))
+        ).rowcount
+    if removed:
+        logger.info(f"Removed {removed} duplicate candidate_job_matches rows")
+
+def backfill_skill_tables(engine: Engine):
+    """Populate job_skills and candidate_skills from the JSON skill columns of rows not linked yet."""
+    sources = [
+        (models.Job, models.Job.required_skills, models.JobSkill, models.JobSkill.job_id),
+        (models.Candidate, models.Candidate.skills, models.CandidateSkill, models.CandidateSkill.candidate_id),
+    ]
+    with engine.begin() as connection:
+        for model, skills_column, link_model, owner_column in sources:
+            rows = connection.execute(
+                select(model.id, skills_column).where(~exists().where(owner_column == model.id))
+            ).all()
+            linked = 0
+            for row_id, skills in rows:
+                skill_ids = models.skill_ids_for(connection, skills)
+                if skill_ids:
+                    connection.execute(
+                        insert(link_model),
+                        [{owner_column.key: row_id, "skill_id": skill_id} for skill_id in skill_ids]
+                    )
+                    linked += 1
+            if linked:
+                logger.info(f"Backfilled {link_model.__tablename__} for {linked} {model.__tablename__} rows")
+
+def merge_skill_aliases(engine: Engine):
+    """Fold skills rows created for aliases (e.g. "React.js") into the row of their canonical skill."""
+    from agents.skill_taxonomy import canonical_skill_key, skill_taxonomy
+
+    skills = models.Skill.__table__
+    links = [models.JobSkill.__table__, models.CandidateSkill.__table__]
+    with engine.begin() as connection:
+        rows = connection.execute(select(skills.c.id, skills.c.canonical_name)).all()
+        by_key = {canonical_name: skill_id for skill_id, canonical_name in rows}
+        merged = 0
+        for skill_id, canonical_name in rows:
+            key = canonical_skill_key(canonical_name)
+            if key == canonical_name:
+                continue
+            target = by_key.get(key)
+            if target is None:
+                connection.execute(
+                    update(skills).where(skills.c.id == skill_id)
+                    .values(name=skill_taxonomy.canonical(canonical_name), canonical_name=key)
+                )
+                by_key[key] = skill_id
+            else:
+                for link in links:
+                    owner = next(column for column in link.primary_key.columns if column.name != "skill_id")
+                    linked = link.alias()
+                    already_linked = select(linked.c[owner.name]).where(linked.c.skill_id == target)
+                    connection.execute(link.insert().from_select(
+                        [owner.name, "skill_id"],
+                        select(owner, literal(target)).where(link.c.skill_id == skill_id, owner.not_in(already_linked))
+                    ))
+                    connection.execute(delete(link).where(link.c.skill_id == skill_id))
+                connection.execute(delete(skills).where(skills.c.id == skill_id))
+            del by_key[canonical_name]
+            merged += 1
+    if merged:
+        logger.info(f"Merged {merged} alias skills rows into their canonical skills")
+
+_MATCH_STATS_TRIGGERS = {
+    "trg_match_stats_insert": """
+        CREATE TRIGGER trg_match_stats_insert AFTER INSERT ON candidate_job_matches
+        BEGIN
+            {add_new}
+        END""",
+    "trg_match_stats_delete": """
+        CREATE TRIGGER trg_match_stats_delete AFTER DELETE ON candidate_job_matches
+        BEGIN
+            {remove_old}
+        END""",
+    "trg_match_stats_update": """
+        CREATE TRIGGER trg_match_stats_update AFTER UPDATE OF match_score, candidate_id ON candidate_job_matches
+        BEGIN
+            {remove_old}
+            {add_new}
+        END""",
+}
+
+_ADD_NEW = """
+            UPDATE match_stats SET
+                total_matches = total_matches + 1,
+                successful_matches = successful_matches + COALESCE(NEW.match_score >= {threshold}, 0),
+                screened_candidates = screened_candidates + (NEW.candidate_id IS NOT NULL AND NOT EXISTS (
+                    SELECT 1 FROM candidate_match_counts WHERE candidate_id = NEW.candidate_id))
+            WHERE id = 1;
+            -- A NULL candidate_id would be given a fresh rowid by the INTEGER PRIMARY KEY; skip it
+            INSERT INTO candidate_match_counts (candidate_id, match_count)
+                SELECT NEW.candidate_id, 1 WHERE NEW.candidate_id IS NOT NULL
+                ON CONFLICT (candidate_id) DO UPDATE SET match_count = match_count + 1;"""
+
+_REMOVE_OLD = """
+            UPDATE candidate_match_counts SET match_count = match_count - 1 WHERE candidate_id = OLD.candidate_id;
+            UPDATE match_stats SET
+                total_matches = total_matches - 1,
+                successful_matches = successful_matches - COALESCE(OLD.match_score >= {threshold}, 0),
+                screened_candidates = screened_candidates - EXISTS (
+                    SELECT 1 FROM candidate_match_counts WHERE candidate_id = OLD.candidate_id AND match_count <= 0)
+            WHERE id = 1;
+            DELETE FROM candidate_match_counts WHERE candidate_id = OLD.candidate_id AND match_count <= 0;"""
+
+def install_match_stats(engine: Engine):
+    """Seed match_stats from the match table and install triggers that keep it current.
+
+    The counters are recomputed once here, then every insert, update and
+    delete on candidate_job_matches (including bulk deletes) adjusts them in
+    O(1). When the stats table is disabled the triggers are dropped and the
+    dashboard falls back to aggregate queries.
+    """
+    if engine.dialect.name != "sqlite":
+        logger.info("match_stats triggers are only installed on SQLite")
+        return
+
+    import crud
+
+    with engine.begin() as connection:
+        for name in _MATCH_STATS_TRIGGERS:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        connection.exec_driver_sql("DELETE FROM match_stats")
+        connection.exec_driver_sql("DELETE FROM candidate_match_counts")
+        if not crud.DASHBOARD_STATS_TABLE:
+            return
+
+        threshold = crud.SUCCESSFUL_MATCH_SCORE
+        connection.exec_driver_sql(
+            "INSERT INTO candidate_match_counts (candidate_id, match_count) "
+            "SELECT candidate_id, COUNT(*) FROM candidate_job_matches "
+            "WHERE candidate_id IS NOT NULL GROUP BY candidate_id"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO match_stats (id, total_matches, successful_matches, screened_candidates) "
+            "SELECT 1, COUNT(*), COUNT(CASE WHEN match_score >= ? THEN 1 END), "
+            "(SELECT COUNT(*) FROM candidate_match_counts) FROM candidate_job_matches",
+            (threshold,)
+        )
+        for sql in _MATCH_STATS_TRIGGERS.values():
+            connection.exec_driver_sql(sql.format(
+                add_new=_ADD_NEW.format(threshold=threshold),
+                remove_old=_REMOVE_OLD.format(threshold=threshold)
+            ))
+    logger.info("match_stats seeded and triggers installed")
+
+def run_migrations(engine: Engine):
+    """Bring an existing database up to date with the current models."""
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    deduplicate_matches(engine)
+    ensure_indexes(engine)
+    merge_skill_aliases(engine)
+    backfill_skill_tables(engine)
+    install_match_stats(engine)
+    logger.info("Database migrations complete")
@@ -1,8 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, JSON, Index, event, select, delete, insert, inspect
+from sqlalchemy.orm import relationship, Session
 from datetime import datetime
 from database import Base
 
+# Candidate.processing_status values
+PENDING = "pending"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+
 class Job(Base):
     __tablename__ = "jobs"
     
@@ -11,7 +17,7 @@ class Job(Base):
     description = Column(String, nullable=False)
     standardized_role = Column(String)
     required_skills = Column(JSON)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
     interviews = relationship("Interview", back_populates="job")
@@ -36,7 +42,10 @@ class Candidate(Base):
     skills = Column(JSON)
     experience = Column(Integer)
     match_scores = Column(JSON)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # PENDING while resume-derived fields are still being extracted in the background
+    processing_status = Column(String, default=COMPLETED, index=True)
+    processing_error = Column(String)
     
     # Relationships
     interviews = relationship("Interview", back_populates="candidate")
@@ -50,7 +59,8 @@ class Candidate(Base):
             "skills": self.skills,
             "experience": self.experience,
             "match_scores": self.match_scores,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "processing_status": self.processing_status or COMPLETED
         }
 
 class Interview(Base):
@@ -71,8 +81,14 @@ class Interview(Base):
     candidate = relationship("Candidate", back_populates="interviews")
     job = relationship("Job", back_populates="interviews")
 
-    def to_dict(self):
-        return {
+    # Cascading deletes and per-candidate/per-job lookups use these instead of scanning
+    __table_args__ = (
+        Index("ix_interviews_candidate_job", "candidate_id", "job_id"),
+        Index("ix_interviews_job_id", "job_id"),
+    )
+
+    def to_dict(self, include_related: bool = True):
+        data = {
             "id": self.id,
             "candidate_id": self.candidate_id,
             "job_id": self.job_id,
@@ -82,10 +98,12 @@ class Interview(Base):
             "responses": self.responses,
             "feedback": self.feedback,
             "score": self.score,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "candidate": self.candidate.to_dict() if self.candidate else None,
-            "job": self.job.to_dict() if self.job else None
+            "created_at": self.created_at.isoformat() if self.created_at else None
         }
+        if include_related:
+            data["candidate"] = self.candidate.to_dict() if self.candidate else None
+            data["job"] = self.job.to_dict() if self.job else None
+        return data
 
 class CandidateJobMatch(Base):
     __tablename__ = "candidate_job_matches"
@@ -96,21 +114,131 @@ class CandidateJobMatch(Base):
     match_score = Column(Float)
     skill_match_details = Column(JSON)
     interview_questions = Column(JSON)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
     candidate = relationship("Candidate")
     job = relationship("Job")
 
-    def to_dict(self):
-        return {
+    # Serve "best matches for a job/candidate" from the index in score order;
+    # the unique pair index is the conflict target for upserts
+    __table_args__ = (
+        Index("uq_candidate_job_matches_pair", "candidate_id", "job_id", unique=True),
+        Index("ix_candidate_job_matches_job_score", "job_id", "match_score"),
+        Index("ix_candidate_job_matches_candidate_score", "candidate_id", "match_score"),
+    )
+
+    def to_dict(self, include_related: bool = True):
+        data = {
             "id": self.id,
             "candidate_id": self.candidate_id,
             "job_id": self.job_id,
             "match_score": self.match_score,
             "skill_match_details": self.skill_match_details,
             "interview_questions": self.interview_questions,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "candidate": self.candidate.to_dict() if self.candidate else None,
-            "job": self.job.to_dict() if self.job else None
+            "created_at": self.created_at.isoformat() if self.created_at else None
         }
+        if include_related:
+            data["candidate"] = self.candidate.to_dict() if self.candidate else None
+            data["job"] = self.job.to_dict() if self.job else None
+        return data
+
+class MatchStats(Base):
+    """Single-row dashboard counters maintained by triggers on candidate_job_matches."""
+    __tablename__ = "match_stats"
+    
+    id = Column(Integer, primary_key=True)
+    total_matches = Column(Integer, nullable=False, default=0)
+    successful_matches = Column(Integer, nullable=False, default=0)
+    screened_candidates = Column(Integer, nullable=False, default=0)
+
+class CandidateMatchCount(Base):
+    """Number of stored matches per candidate, used to maintain MatchStats.screened_candidates."""
+    __tablename__ = "candidate_match_counts"
+    
+    candidate_id = Column(Integer, primary_key=True)
+    match_count = Column(Integer, nullable=False, default=0)
+
+class Skill(Base):
+    __tablename__ = "skills"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    # Normalized canonical skill from the skill taxonomy; all aliases of a skill share one row
+    canonical_name = Column(String, nullable=False, unique=True, index=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "canonical_name": self.canonical_name
+        }
+
+class JobSkill(Base):
+    __tablename__ = "job_skills"
+    
+    job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True, index=True)
+
+class CandidateSkill(Base):
+    __tablename__ = "candidate_skills"
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True, index=True)
+
+def skill_ids_for(connection, skills) -> list:
+    """Ids of the skills rows for the given names, creating missing rows.
+
+    Aliases known to the skill taxonomy resolve to the row of their canonical
+    skill, so "React.js" and "React" share one row.
+    """
+    from agents.skill_taxonomy import canonical_skill_key, skill_taxonomy
+
+    names = {}
+    for skill in skills or []:
+        canonical = canonical_skill_key(skill)
+        if canonical and canonical not in names:
+            names[canonical] = skill_taxonomy.canonical(skill) or skill.strip()
+    if not names:
+        return []
+
+    existing = dict(connection.execute(
+        select(Skill.canonical_name, Skill.id).where(Skill.canonical_name.in_(list(names)))
+    ).all())
+    missing = [{"name": names[c], "canonical_name": c} for c in names if c not in existing]
+    if missing:
+        connection.execute(insert(Skill), missing)
+        existing.update(connection.execute(
+            select(Skill.canonical_name, Skill.id).where(Skill.canonical_name.in_([m["canonical_name"] for m in missing]))
+        ).all())
+    return [existing[c] for c in names]
+
+# The JSON skill columns stay as the API representation; the link tables mirror them for SQL queries
+_SKILL_LINKS = {
+    Job: ("required_skills", JobSkill, JobSkill.job_id),
+    Candidate: ("skills", CandidateSkill, CandidateSkill.candidate_id),
+}
+
+@event.listens_for(Session, "after_flush")
+def _sync_skill_links(session, flush_context):
+    connection = session.connection()
+    for obj in list(session.new) + list(session.dirty):
+        link = _SKILL_LINKS.get(type(obj))
+        if link is None:
+            continue
+        attribute, link_model, owner_column = link
+        if obj in session.dirty and not inspect(obj).attrs[attribute].history.has_changes():
+            continue
+        connection.execute(delete(link_model).where(owner_column == obj.id))
+        skill_ids = skill_ids_for(connection, getattr(obj, attribute))
+        if skill_ids:
+            connection.execute(
+                insert(link_model),
+                [{owner_column.key: obj.id, "skill_id": skill_id} for skill_id in skill_ids]
+            )
+
+    for obj in session.deleted:
+        link = _SKILL_LINKS.get(type(obj))
+        if link is not None:
+            _, link_model, owner_column = link
+            connection.execute(delete(link_model).where(owner_column == obj.id))
@@ -29,12 +29,20 @@ class CandidateBase(BaseModel):
 class CandidateCreate(CandidateBase):
     pass
 
+class CandidateUpdate(BaseModel):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    resume: Optional[str] = None
+    skills: Optional[List[str]] = None
+    experience: Optional[int] = None
+
 class Candidate(CandidateBase):
     id: int
     skills: Optional[List[str]] = None
     experience: Optional[int] = None
     match_scores: Optional[Dict] = None
     created_at: datetime
+    processing_status: Optional[str] = None
     
     class Config:
         orm_mode = True
@@ -99,6 +107,11 @@ class JobCreate(JobBase):
             datetime: lambda v: v.isoformat()
         }
 
+class JobUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    required_skills: Optional[List[str]] = None
+
 class Job(JobBase):
     id: int
     standardized_role: Optional[str] = None
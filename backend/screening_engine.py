@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes used for sharded screening (1 keeps screening in-process)
+SCREENING_WORKERS = int(os.getenv("SCREENING_WORKERS", "1"))
+# Candidates per shard; smaller shards balance load and report progress more often
+SCREENING_SHARD_SIZE = int(os.getenv("SCREENING_SHARD_SIZE", "32"))
+
+_worker_agent = None
+
+def _default_agent_factory():
+    from agents.screening_agent import AutoScreeningAgent
+    return AutoScreeningAgent()
+
+def _init_worker(agent_factory: Callable, torch_threads: int):
+    """Load a private model copy in each worker process."""
+    import torch
+    torch.set_num_threads(torch_threads)
+    global _worker_agent
+    _worker_agent = agent_factory()
+
+def _screen_shard(job: Dict, candidates: List[Dict]) -> List[Dict]:
+    from agents.skill_equivalence import skill_equivalence
+    # Skip skill pairs other workers have scored since this worker last looked
+    skill_equivalence.refresh()
+    return asyncio.run(_worker_agent.screen_all_candidates([job], candidates))
+
+def merge_matches(shards: List[List[Dict]]) -> List[Dict]:
+    """Merge shard results into one list ordered by score, then job id, then candidate id."""
+    matches = [match for shard in shards for match in shard]
+    matches.sort(key=lambda m: (-m["match_score"], m["job_id"], m["candidate_id"]))
+    return matches
+
+class ShardedScreeningEngine:
+    """Screens the job x candidate space across a pool of worker processes.
+
+    The space is cut into shards of one job and up to ``shard_size``
+    candidates. Each worker process loads its own model copy once and
+    screens whole shards, and the parent merges the partial results into a
+    deterministic, score-sorted order. ``screen`` has the same signature as
+    ``AutoScreeningAgent.screen_all_candidates`` so the two are interchangeable.
+    """
+
+    def __init__(
+        self,
+        workers: int = SCREENING_WORKERS,
+        shard_size: int = SCREENING_SHARD_SIZE,
+        agent_factory: Callable = _default_agent_factory
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.shard_size = max(1, shard_size)
+        self.agent_factory = agent_factory
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            logger.info(f"Starting {self.workers} screening worker(s) with {torch_threads} torch thread(s) each")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.agent_factory, torch_threads)
+            )
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def make_shards(
+        self,
+        jobs: List[Dict],
+        candidates: List[Dict],
+        skill_index=None,
+        min_skill_overlap: int = 1
+    ) -> List[Tuple[Dict, List[Dict]]]:
+        from agents.skill_equivalence import skill_equivalence
+
+        shards = []
+        for job in jobs:
+            plausible = candidates
+            if skill_index is not None:
+                plausible = skill_index.filter_candidates(
+                    job.get("required_skills", []),
+                    candidates,
+                    min_overlap=min_skill_overlap,
+                    expand=skill_equivalence.equivalents
+                )
+            for start in range(0, len(plausible), self.shard_size):
+                shards.append((job, plausible[start:start + self.shard_size]))
+        return shards
+
+    async def screen(
+        self,
+        jobs: List[Dict],
+        candidates: List[Dict],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        skill_index=None,
+        min_skill_overlap: int = 1
+    ) -> List[Dict]:
+        matches = merge_matches([
+            [match async for match in self.iter_matches(
+                jobs, candidates, on_progress, skill_index, min_skill_overlap
+            )]
+        ])
+        logger.info(f"Sharded screening completed. Found {len(matches)} matches")
+        return matches
+
+    async def iter_matches(
+        self,
+        jobs: List[Dict],
+        candidates: List[Dict],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        skill_index=None,
+        min_skill_overlap: int = 1
+    ) -> AsyncIterator[Dict]:
+        """Yield each shard's matches as soon as that shard finishes."""
+        from agents.screening_agent import load_skill_equivalence
+        await load_skill_equivalence()
+        shards = self.make_shards(jobs, candidates, skill_index, min_skill_overlap)
+        total_pairs = sum(len(shard_candidates) for _, shard_candidates in shards)
+        logger.info(f"Screening {total_pairs} pairs in {len(shards)} shards on {self.workers} worker(s)")
+
+        done_pairs = 0
+        if on_progress:
+            on_progress(done_pairs, total_pairs)
+
+        from agents.base_agent import get_storage_executor
+        from agents.skill_equivalence import skill_equivalence
+
+        loop = asyncio.get_running_loop()
+
+        async def run_shard(job: Dict, shard_candidates: List[Dict]) -> Tuple[int, List[Dict]]:
+            matches = await loop.run_in_executor(self.pool, _screen_shard, job, shard_candidates)
+            return len(shard_candidates), matches
+
+        tasks = [loop.create_task(run_shard(job, shard)) for job, shard in shards]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                shard_pairs, shard_matches = await finished
+                # Workers record skill pairs in the shared table; load them so later runs are pruned with them
+                await loop.run_in_executor(get_storage_executor(), skill_equivalence.refresh)
+                done_pairs += shard_pairs
+                if on_progress:
+                    on_progress(done_pairs, total_pairs)
+                for match in shard_matches:
+                    yield match
+        finally:
+            # Closed early (the run was cancelled or failed): drop the shards no worker has started
+            for task in tasks:
+                task.cancel()
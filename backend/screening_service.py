@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import crud
+import models
+from background_queue import BackgroundQueue
+
+logger = logging.getLogger(__name__)
+
+# How many finished runs are kept for polling before the oldest is dropped
+MAX_KEPT_RUNS = 20
+
+# Run statuses after which nothing more is published
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# Rows re-screened together by the incremental screener
+INCREMENTAL_SCREENING_BATCH_SIZE = int(os.getenv("INCREMENTAL_SCREENING_BATCH_SIZE", "64"))
+
+# Minimum number of shared skills for a candidate-job pair to be evaluated
+MIN_SKILL_OVERLAP = int(os.getenv("MIN_SKILL_OVERLAP", "1"))
+
+def save_match(db: Session, match: Dict):
+    """Insert or update the stored match for a candidate-job pair."""
+    crud.upsert_match(
+        db,
+        match["candidate_id"],
+        match["job_id"],
+        match["match_score"],
+        skill_match_details=match["skill_match_details"],
+        interview_questions=match["interview_questions"]
+    )
+
+def save_matches(db: Session, matches: List[Dict]):
+    for match in matches:
+        save_match(db, match)
+
+async def load_jobs_and_candidates(db) -> tuple:
+    """All jobs and candidates as dicts, read through an async session."""
+    jobs = [job.to_dict() for job in (await db.execute(select(models.Job))).scalars()]
+    candidates = [candidate.to_dict() for candidate in (await db.execute(select(models.Candidate))).scalars()]
+    return jobs, candidates
+
+class ScreeningRun:
+    """Progress and results of one background screening run."""
+
+    def __init__(self, total_pairs: int = 0):
+        self.id = uuid.uuid4().hex
+        self.status = "pending"
+        self.total_pairs = total_pairs
+        self.done_pairs = 0
+        self.matches: List[Dict] = []
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Everything published for streaming clients, so one that reconnects can resume where it left off
+        self.events: List[Dict] = []
+        self._published = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def publish(self, event: Dict):
+        self.events.append(event)
+        self._published.set()
+        self._published = asyncio.Event()
+
+    async def follow(self, after: int = 0) -> AsyncIterator[Tuple[int, Dict]]:
+        """Yield ``(event_id, event)`` for every event after ``after``, waiting for new ones until the run ends.
+
+        Event ids count from 1. The last event of a run is always a
+        ``summary``, ``error`` or ``cancelled`` event.
+        """
+        while True:
+            published = self._published
+            while after < len(self.events):
+                after += 1
+                yield after, self.events[after - 1]
+            if self.finished:
+                return
+            await published.wait()
+
+    def update_progress(self, done: int, total: int):
+        self.done_pairs = done
+        self.total_pairs = total
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if self.status != "running" or not self.done_pairs or self.started_at is None:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        return elapsed / self.done_pairs * (self.total_pairs - self.done_pairs)
+
+    def to_dict(self, include_results: bool = True) -> Dict:
+        data = {
+            "run_id": self.id,
+            "status": self.status,
+            "pairs_done": self.done_pairs,
+            "pairs_total": self.total_pairs,
+            "eta_seconds": round(self.eta_seconds, 1) if self.eta_seconds is not None else None,
+            "matches_found": len(self.matches),
+            "error": self.error,
+            "created_at": self.created_at.isoformat()
+        }
+        if include_results and self.status == "completed":
+            data["results"] = self.matches
+        return data
+
+class ScreeningRunManager:
+    """Starts screening runs as background tasks and keeps them available for polling and streaming.
+
+    Runs use the sharded multi-process ``engine`` when one is given and the
+    in-process agent otherwise. ``session_factory`` must produce async sessions.
+    """
+
+    def __init__(self, agent, session_factory, skill_index=None, min_skill_overlap: int = MIN_SKILL_OVERLAP, engine=None):
+        self.agent = agent
+        self.engine = engine
+        self.session_factory = session_factory
+        self.skill_index = skill_index
+        self.min_skill_overlap = min_skill_overlap
+        self._runs: "OrderedDict[str, ScreeningRun]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self) -> ScreeningRun:
+        run = ScreeningRun()
+        self._runs[run.id] = run
+        while len(self._runs) > MAX_KEPT_RUNS:
+            oldest_id = next(iter(self._runs))
+            if not self._runs[oldest_id].finished:
+                break
+            del self._runs[oldest_id]
+
+        task = asyncio.get_running_loop().create_task(self._execute(run))
+        self._tasks[run.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(run.id, None))
+        logger.info(f"Started screening run {run.id}")
+        return run
+
+    def get(self, run_id: str) -> Optional[ScreeningRun]:
+        return self._runs.get(run_id)
+
+    async def cancel(self, run_id: str) -> Optional[ScreeningRun]:
+        """Stop a pending or running run, cancelling the work it has not started yet."""
+        run = self._runs.get(run_id)
+        task = self._tasks.get(run_id)
+        if task:
+            task.cancel()
+            await asyncio.wait({task})
+        if run and not run.finished:
+            # Cancelled before it started
+            run.status = "cancelled"
+            run.publish({"type": "cancelled", "pairs_done": 0, "pairs_total": 0})
+        return run
+
+    async def _execute(self, run: ScreeningRun):
+        db = self.session_factory()
+        try:
+            jobs, candidates = await load_jobs_and_candidates(db)
+            run.total_pairs = len(jobs) * len(candidates)
+            run.status = "running"
+            run.started_at = time.monotonic()
+
+            source = self.engine if self.engine else self.agent
+            matches = []
+            async for match in source.iter_matches(
+                jobs,
+                candidates,
+                on_progress=run.update_progress,
+                skill_index=self.skill_index,
+                min_skill_overlap=self.min_skill_overlap
+            ):
+                matches.append(match)
+                run.publish({"type": "match", "pairs_done": run.done_pairs, "pairs_total": run.total_pairs, "match": match})
+            matches.sort(key=lambda m: (-m["match_score"], m["job_id"], m["candidate_id"]))
+
+            await db.run_sync(save_matches, matches)
+            await db.commit()
+
+            run.matches = matches
+            run.status = "completed"
+            logger.info(f"Screening run {run.id} completed with {len(matches)} matches")
+            run.publish({
+                "type": "summary",
+                "pairs_done": run.done_pairs,
+                "pairs_total": run.total_pairs,
+                "matches_found": len(matches),
+                "elapsed_seconds": round(time.monotonic() - run.started_at, 2)
+            })
+
+        except asyncio.CancelledError:
+            logger.info(f"Screening run {run.id} cancelled")
+            await db.rollback()
+            run.status = "cancelled"
+            run.publish({"type": "cancelled", "pairs_done": run.done_pairs, "pairs_total": run.total_pairs})
+            raise
+        except Exception as e:
+            logger.error(f"Screening run {run.id} failed: {str(e)}")
+            logger.exception("Full traceback:")
+            await db.rollback()
+            run.error = str(e)
+            run.status = "failed"
+            run.publish({"type": "error", "detail": str(e)})
+        finally:
+            run.finished_at = time.monotonic()
+            await db.close()
+
+class IncrementalScreener(BackgroundQueue):
+    """Background queue that re-screens only the pairs touched by new or changed rows.
+
+    ``enqueue_job(job_id)`` re-evaluates that job against the existing
+    candidates and ``enqueue_candidate(candidate_id)`` re-evaluates that
+    candidate against the existing jobs. Queued rows are taken off in batches
+    of up to ``batch_size``, and all the jobs (or candidates) of a batch are
+    screened in one call, so a bulk import reads the other table once per
+    batch rather than once per row. Matches are upserted, and stored matches
+    for the rows that no longer pass the threshold are removed.
+    """
+
+    name = "Incremental screener"
+
+    def __init__(
+        self,
+        agent,
+        session_factory,
+        skill_index=None,
+        min_skill_overlap: int = MIN_SKILL_OVERLAP,
+        batch_size: int = INCREMENTAL_SCREENING_BATCH_SIZE
+    ):
+        super().__init__(session_factory, batch_size)
+        self.agent = agent
+        self.skill_index = skill_index
+        self.min_skill_overlap = min_skill_overlap
+
+    def enqueue_job(self, job_id: int):
+        self._enqueue(("job", job_id))
+
+    def enqueue_candidate(self, candidate_id: int):
+        self._enqueue(("candidate", candidate_id))
+
+    def enqueue_candidates(self, candidate_ids: Iterable[int]):
+        for candidate_id in candidate_ids:
+            self.enqueue_candidate(candidate_id)
+
+    async def _handle(self, items: List):
+        for kind in ("job", "candidate"):
+            row_ids = [row_id for item_kind, row_id in items if item_kind == kind]
+            if row_ids:
+                await self._screen(kind, row_ids)
+                self.processed += len(row_ids)
+
+    async def _screen(self, kind: str, row_ids: List[int]):
+        async with self.session_factory() as db:
+            try:
+                if kind == "job":
+                    jobs = [job.to_dict() for job in (await db.execute(
+                        select(models.Job).where(models.Job.id.in_(row_ids))
+                    )).scalars()]
+                    if not jobs:
+                        return
+                    candidates = [candidate.to_dict() for candidate in (await db.execute(select(models.Candidate))).scalars()]
+                    stale_filter = models.CandidateJobMatch.job_id.in_(row_ids)
+                else:
+                    candidates = [candidate.to_dict() for candidate in (await db.execute(
+                        select(models.Candidate).where(models.Candidate.id.in_(row_ids))
+                    )).scalars()]
+                    if not candidates:
+                        return
+                    jobs = [job.to_dict() for job in (await db.execute(select(models.Job))).scalars()]
+                    stale_filter = models.CandidateJobMatch.candidate_id.in_(row_ids)
+
+                logger.info(f"Incrementally screening {len(row_ids)} {kind}(s)")
+                matches = await self.agent.screen_all_candidates(
+                    jobs,
+                    candidates,
+                    skill_index=self.skill_index,
+                    min_skill_overlap=self.min_skill_overlap
+                )
+
+                matched_pairs = {(match["candidate_id"], match["job_id"]) for match in matches}
+                stale = (await db.execute(select(models.CandidateJobMatch).where(stale_filter))).scalars().all()
+                for db_match in stale:
+                    if (db_match.candidate_id, db_match.job_id) not in matched_pairs:
+                        await db.delete(db_match)
+                await db.run_sync(save_matches, matches)
+                await db.commit()
+                logger.info(f"Incremental screening of {len(row_ids)} {kind}(s) stored {len(matches)} matches")
+
+            except Exception:
+                await db.rollback()
+                raise
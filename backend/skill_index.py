@@ -0,0 +1,94 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from agents.skill_equivalence import normalize_skill
+from agents.skill_taxonomy import canonical_skill_key
+
+logger = logging.getLogger(__name__)
+
+class SkillIndex:
+    """Inverted index from canonical skill key to the ids of candidates listing it.
+
+    Skills are keyed through the skill taxonomy's alias map, so a candidate
+    listing "React.js" is found for a job requiring "React".
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._candidate_skills: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def rebuild(self, candidates: Iterable[Dict]):
+        """Replace the index contents with the given candidate dicts."""
+        with self._lock:
+            self._postings.clear()
+            self._candidate_skills.clear()
+            for candidate in candidates:
+                self._add(candidate["id"], candidate.get("skills") or [])
+        logger.info(f"Skill index built for {len(self._candidate_skills)} candidates "
+                    f"and {len(self._postings)} skills")
+
+    def add_candidate(self, candidate_id: int, skills: List[str]):
+        """Index a candidate, replacing any skills previously indexed for it."""
+        with self._lock:
+            self._remove(candidate_id)
+            self._add(candidate_id, skills or [])
+
+    def remove_candidate(self, candidate_id: int):
+        with self._lock:
+            self._remove(candidate_id)
+
+    def candidates_for(
+        self,
+        required_skills: List[str],
+        min_overlap: int = 1,
+        expand: Optional[Callable[[str], Set[str]]] = None
+    ) -> Set[int]:
+        """Ids of candidates sharing at least min_overlap of the required skills.
+
+        ``expand(skill)`` may return extra normalized skill names that also
+        satisfy a required skill (e.g. known equivalents). Required skills
+        and their equivalents are compared by canonical key.
+        """
+        overlap: Dict[int, int] = defaultdict(int)
+        with self._lock:
+            by_key: Dict[str, Set[str]] = defaultdict(set)
+            for skill in required_skills or []:
+                by_key[canonical_skill_key(skill)].update({normalize_skill(skill), canonical_skill_key(skill)})
+            for key, spellings in by_key.items():
+                names = set(spellings)
+                if expand:
+                    for spelling in spellings:
+                        names |= expand(spelling)
+                matching: Set[int] = set()
+                for name in {canonical_skill_key(name) for name in names}:
+                    matching |= self._postings.get(name, set())
+                for candidate_id in matching:
+                    overlap[candidate_id] += 1
+        return {candidate_id for candidate_id, count in overlap.items() if count >= min_overlap}
+
+    def filter_candidates(
+        self,
+        required_skills: List[str],
+        candidates: List[Dict],
+        min_overlap: int = 1,
+        expand: Optional[Callable[[str], Set[str]]] = None
+    ) -> List[Dict]:
+        """The candidate dicts, in their original order, that pass candidates_for."""
+        plausible_ids = self.candidates_for(required_skills, min_overlap=min_overlap, expand=expand)
+        return [candidate for candidate in candidates if candidate["id"] in plausible_ids]
+
+    def _add(self, candidate_id: int, skills: List[str]):
+        normalized = {canonical_skill_key(skill) for skill in skills if skill}
+        self._candidate_skills[candidate_id] = normalized
+        for skill in normalized:
+            self._postings[skill].add(candidate_id)
+
+    def _remove(self, candidate_id: int):
+        for skill in self._candidate_skills.pop(candidate_id, set()):
+            posting = self._postings.get(skill)
+            if posting is not None:
+                posting.discard(candidate_id)
+                if not posting:
+                    del self._postings[skill]
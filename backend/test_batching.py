@@ -0,0 +1,77 @@
+import asyncio
+from concurrent.futures import Executor, Future
+import pytest
+from agents.batching import BatchScheduler
+
+class InlineExecutor(Executor):
+    """Runs submitted work immediately on the calling thread."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+def make_scheduler(max_batch_size=4, window_ms=20, fail=False):
+    calls = []
+
+    def run_batch(prompts, max_length):
+        calls.append((list(prompts), max_length))
+        if fail:
+            raise RuntimeError("model exploded")
+        return [f"{prompt}:{max_length}" for prompt in prompts]
+
+    executor = InlineExecutor()
+    return BatchScheduler(run_batch, lambda: executor, max_batch_size=max_batch_size, window_ms=window_ms), calls
+
+def test_prompts_within_the_window_run_as_one_batch_and_outputs_return_to_callers():
+    scheduler, calls = make_scheduler()
+
+    async def main():
+        return await asyncio.gather(*(scheduler.submit(f"p{i}", 10) for i in range(3)))
+
+    assert asyncio.run(main()) == ["p0:10", "p1:10", "p2:10"]
+    assert calls == [(["p0", "p1", "p2"], 10)]
+    assert scheduler.stats() == {"batches_run": 1, "prompts_run": 3, "average_batch_size": 3.0}
+
+def test_reaching_max_size_flushes_without_waiting_for_the_window():
+    scheduler, calls = make_scheduler(max_batch_size=2, window_ms=60_000)
+
+    async def main():
+        return await asyncio.wait_for(asyncio.gather(scheduler.submit("a", 5), scheduler.submit("b", 5)), timeout=5)
+
+    assert asyncio.run(main()) == ["a:5", "b:5"]
+    assert calls == [(["a", "b"], 5)]
+
+def test_window_flushes_a_partial_batch():
+    scheduler, calls = make_scheduler(max_batch_size=8, window_ms=10)
+    assert asyncio.run(scheduler.submit("alone", 7)) == "alone:7"
+    assert calls == [(["alone"], 7)]
+
+def test_prompts_are_grouped_by_max_length():
+    scheduler, calls = make_scheduler(max_batch_size=8)
+
+    async def main():
+        return await asyncio.gather(
+            scheduler.submit("a", 10), scheduler.submit("b", 20), scheduler.submit("c", 10)
+        )
+
+    assert asyncio.run(main()) == ["a:10", "b:20", "c:10"]
+    assert sorted(calls) == [(["a", "c"], 10), (["b"], 20)]
+
+def test_errors_propagate_to_every_caller_in_the_batch():
+    scheduler, calls = make_scheduler(fail=True)
+
+    async def main():
+        return await asyncio.gather(*(scheduler.submit(p, 10) for p in "xyz"), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert scheduler.stats()["batches_run"] == 0
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        BatchScheduler(lambda prompts, max_length: prompts, InlineExecutor, max_batch_size=0)
@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+import bulk_import
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+def parse(data: str, format: str, chunk_size: int = 7):
+    async def collect():
+        return [item async for item in bulk_import.iter_records(chunked(data.encode("utf-8"), chunk_size), format)]
+    return asyncio.run(collect())
+
+def test_csv_records_survive_chunk_boundaries_and_quoted_newlines():
+    data = '\ufeffName,Email,Resume,Skills\n"Ann","a@x","line one\nline two, with ""quotes""","Python;Go"\n\nBob,b@x,r,\n'
+    rows = parse(data, "csv")
+    assert rows == [
+        (1, {"name": "Ann", "email": "a@x", "resume": 'line one\nline two, with "quotes"', "skills": "Python;Go"}),
+        (2, {"name": "Bob", "email": "b@x", "resume": "r", "skills": ""}),
+    ]
+
+def test_csv_reports_malformed_rows():
+    rows = parse('name,email,resume\nA,a@x,r,extra\nB,b@x,"unterminated\n', "csv")
+    assert isinstance(rows[0][1], ValueError)
+    assert rows[1][0] == 2 and isinstance(rows[1][1], ValueError)
+
+def test_jsonl_records_and_errors():
+    rows = parse('{"name": "J", "email": "j@x", "resume": "r"}\n\nnot json\n[1]\n{"name": "K"}', "jsonl", chunk_size=3)
+    assert rows[0] == (1, {"name": "J", "email": "j@x", "resume": "r"})
+    assert [row for row, record in rows if isinstance(record, ValueError)] == [2, 3]
+    assert rows[3] == (4, {"name": "K"})
+
+def test_candidate_fields():
+    fields = bulk_import.candidate_fields({"name": " Ann ", "email": "a@x", "resume": "r", "skills": "SQL, AWS", "experience": "4"})
+    assert fields == {"name": "Ann", "email": "a@x", "resume": "r", "skills": ["SQL", "AWS"], "experience": 4}
+    assert bulk_import.candidate_fields({"name": "A", "email": "a@x", "resume": "r", "skills": ["Go"]})["skills"] == ["Go"]
+    with pytest.raises(ValueError):
+        bulk_import.candidate_fields({"name": "A", "email": "", "resume": "r"})
+    with pytest.raises(ValueError):
+        bulk_import.candidate_fields({"name": "A", "email": "a@x", "resume": "r", "experience": "five"})
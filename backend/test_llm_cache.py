@@ -0,0 +1,44 @@
+import sqlite3
+import threading
+from agents.llm_cache import LLMCache
+
+def test_put_many_and_get_many_use_both_tiers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = LLMCache(path=path, memory_size=10, disk_size=100, enabled=True)
+    cache.put_many([("a", "m", "one"), ("b", "m", {"x": 2})])
+    assert cache.get_many(["a", "b", "c"]) == ["one", {"x": 2}, None]
+    assert cache.memory_hits == 2 and cache.misses == 1
+
+    # A fresh instance has an empty memory tier and must read the disk
+    cold = LLMCache(path=path, memory_size=10, disk_size=100, enabled=True)
+    assert cold.get_many(["a", "b"], disk=False) == [None, None]
+    assert cold.misses == 0
+    assert cold.get_many(["b", "a", "b"]) == [{"x": 2}, "one", {"x": 2}]
+    assert cold.disk_hits == 3
+    assert cold.get("a") == "one" and cold.memory_hits == 1
+
+def test_disk_hits_write_last_used_lazily(tmp_path):
+    path = str(tmp_path / "cache.db")
+    LLMCache(path=path, enabled=True).put_many([("a", "m", "one")])
+    before = sqlite3.connect(path).execute("SELECT last_used FROM llm_cache").fetchone()[0]
+
+    cache = LLMCache(path=path, enabled=True)
+    statements = []
+    cache._connection().set_trace_callback(statements.append)
+    cache.get_many(["a"])
+    assert not any(statement.startswith("UPDATE") for statement in statements)
+    cache.flush()
+    after = sqlite3.connect(path).execute("SELECT last_used FROM llm_cache").fetchone()[0]
+    assert after > before
+
+def test_memory_lookups_do_not_wait_for_disk_work(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.db"), enabled=True)
+    cache.put_many([("a", "m", "one")])
+    results = []
+    with cache._disk_lock:
+        # Simulates a store or prune holding the SQLite tier on the storage thread
+        reader = threading.Thread(target=lambda: results.append(cache.get_many(["a", "b"], disk=False)))
+        reader.start()
+        reader.join(timeout=2)
+        assert not reader.is_alive()
+    assert results == [["one", None]]
@@ -0,0 +1,53 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import crud
+import migrations
+import models
+from database import Base
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    Base.metadata.create_all(bind=engine)
+    migrations.install_match_stats(engine)
+    db = sessionmaker(bind=engine)()
+    job = models.Job(title="Job", description="", required_skills=["Python"])
+    candidates = [
+        models.Candidate(name=f"C{i}", email=f"c{i}@example.com", resume="", skills=["Python"], experience=1)
+        for i in range(3)
+    ]
+    db.add_all([job] + candidates)
+    db.commit()
+    return db, job, candidates
+
+def assert_stats_match(db):
+    db.expire_all()
+    assert crud.match_stats(db) == crud.aggregate_match_stats(db)
+
+def test_trigger_maintained_stats_match_aggregates(tmp_path):
+    db, job, (a, b, c) = make_session(tmp_path)
+
+    crud.upsert_match(db, a.id, job.id, 0.9)
+    crud.upsert_match(db, b.id, job.id, 0.5)
+    db.commit()
+    assert_stats_match(db)
+    assert crud.match_stats(db) == {"total_matches": 2, "successful_matches": 1, "screened_candidates": 2}
+
+    # Updating an existing pair moves it across the success threshold without adding a match
+    crud.upsert_match(db, b.id, job.id, 0.8)
+    db.commit()
+    assert_stats_match(db)
+    assert crud.match_stats(db)["successful_matches"] == 2
+
+    # A match without a candidate counts as a match but not as a screened candidate
+    db.add(models.CandidateJobMatch(candidate_id=None, job_id=job.id, match_score=0.9))
+    db.commit()
+    assert_stats_match(db)
+    assert crud.match_stats(db)["screened_candidates"] == 2
+
+    crud.upsert_match(db, c.id, job.id, 0.1)
+    db.commit()
+    db.query(models.CandidateJobMatch).filter(models.CandidateJobMatch.match_score >= 0.8).delete(synchronize_session=False)
+    db.commit()
+    assert_stats_match(db)
+    assert crud.match_stats(db) == {"total_matches": 1, "successful_matches": 0, "screened_candidates": 1}
+    db.close()
@@ -0,0 +1,159 @@
+from datetime import datetime
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+import crud
+import migrations
+import models
+from database import Base
+
+def make_session(num_jobs, num_candidates):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    jobs = [models.Job(title=f"Job {i}", description="", required_skills=["Python"]) for i in range(num_jobs)]
+    candidates = [
+        models.Candidate(name=f"Candidate {i}", email=f"c{i}@example.com", resume="", skills=["Python"], experience=1)
+        for i in range(num_candidates)
+    ]
+    db.add_all(jobs + candidates)
+    db.flush()
+    for job in jobs:
+        for candidate in candidates:
+            db.add(models.CandidateJobMatch(candidate_id=candidate.id, job_id=job.id, match_score=0.8))
+            db.add(models.Interview(candidate_id=candidate.id, job_id=job.id))
+    db.commit()
+    # Start from an empty identity map so nothing is served without SQL
+    db.expunge_all()
+    return engine, db
+
+def count_queries(engine, fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements), result
+
+def test_matches_query_count_is_constant():
+    counts = []
+    for num_jobs, num_candidates in [(1, 2), (4, 10)]:
+        engine, db = make_session(num_jobs, num_candidates)
+        count, serialized = count_queries(
+            engine, lambda: crud.serialize_with_related(crud.matches_with_related(db).all())
+        )
+        assert len(serialized) == num_jobs * num_candidates
+        assert all(match["candidate"] and match["job"] for match in serialized)
+        counts.append(count)
+        db.close()
+    # One SELECT for the matches plus one each for their candidates and jobs
+    assert counts == [3, 3]
+
+def test_interviews_query_count_is_constant():
+    counts = []
+    for num_jobs, num_candidates in [(1, 2), (4, 10)]:
+        engine, db = make_session(num_jobs, num_candidates)
+        count, serialized = count_queries(
+            engine, lambda: crud.serialize_with_related(crud.interviews_with_related(db).all())
+        )
+        assert len(serialized) == num_jobs * num_candidates
+        counts.append(count)
+        db.close()
+    assert counts == [3, 3]
+
+def test_related_rows_are_serialized_once():
+    engine, db = make_session(2, 3)
+    serialized = crud.serialize_with_related(crud.matches_with_related(db).all())
+    by_job = {}
+    for match in serialized:
+        by_job.setdefault(match["job_id"], []).append(match["job"])
+    for job_dicts in by_job.values():
+        assert all(job_dict is job_dicts[0] for job_dict in job_dicts)
+    db.close()
+
+def test_skill_aliases_share_one_skill_row():
+    engine, db = make_session(0, 0)
+    db.add_all([
+        models.Candidate(name="A", email="a@example.com", resume="", skills=["React.js", "Amazon Web Services"]),
+        models.Candidate(name="B", email="b@example.com", resume="", skills=["React", "AWS"]),
+        models.Candidate(name="C", email="c@example.com", resume="", skills=["Vue"]),
+    ])
+    db.commit()
+    assert {skill.name for skill in db.query(models.Skill)} == {"React", "AWS", "Vue.js"}
+    assert {c.name for c in crud.candidates_with_skills(db, ["reactjs", "AWS"])} == {"A", "B"}
+    db.close()
+
+def test_migration_merges_alias_skill_rows():
+    engine, db = make_session(0, 0)
+    db.add_all([
+        models.Candidate(name="A", email="a@example.com", resume="", skills=["React"]),
+        models.Candidate(name="B", email="b@example.com", resume="", skills=["Golang"]),
+    ])
+    db.commit()
+    react, go = db.query(models.Skill).order_by(models.Skill.id).all()
+    # Rows as an older version created them, keyed by the spelling instead of the canonical skill
+    alias = models.Skill(name="React.js", canonical_name="react.js")
+    go.name, go.canonical_name = "Golang", "golang"
+    db.add(alias)
+    db.flush()
+    a, b = db.query(models.Candidate).order_by(models.Candidate.id).all()
+    db.add_all([
+        models.CandidateSkill(candidate_id=a.id, skill_id=alias.id),
+        models.CandidateSkill(candidate_id=b.id, skill_id=alias.id),
+    ])
+    db.commit()
+
+    migrations.merge_skill_aliases(engine)
+    db.expire_all()
+    assert sorted((s.name, s.canonical_name) for s in db.query(models.Skill)) == [("Go", "go"), ("React", "react")]
+    links = {(link.candidate_id, link.skill_id) for link in db.query(models.CandidateSkill)}
+    assert links == {(a.id, react.id), (b.id, react.id), (b.id, go.id)}
+    db.close()
+
+def test_paginate_follows_cursor_to_the_last_page():
+    engine, db = make_session(0, 5)
+    query = db.query(models.Candidate)
+    pages, after = [], None
+    while True:
+        rows, after = crud.paginate(query, models.Candidate.id, 2, after)
+        pages.append([row.id for row in rows])
+        if after is None:
+            break
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == sorted(sum(pages, []))
+    db.close()
+
+def test_deduplicate_matches_keeps_newest_row_and_unique_index_builds():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    # A database from before the unique pair index existed
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX uq_candidate_job_matches_pair")
+    db = sessionmaker(bind=engine)()
+    job = models.Job(title="Job", description="", required_skills=["Python"])
+    a = models.Candidate(name="A", email="a@example.com", resume="", skills=["Python"], experience=1)
+    b = models.Candidate(name="B", email="b@example.com", resume="", skills=["Python"], experience=1)
+    db.add_all([job, a, b])
+    db.flush()
+    older, newer = datetime(2024, 1, 1), datetime(2024, 6, 1)
+    db.add_all([
+        models.CandidateJobMatch(candidate_id=a.id, job_id=job.id, match_score=0.1, created_at=newer),
+        models.CandidateJobMatch(candidate_id=a.id, job_id=job.id, match_score=0.2, created_at=older),
+        # Equal timestamps fall back to the highest id
+        models.CandidateJobMatch(candidate_id=b.id, job_id=job.id, match_score=0.3, created_at=older),
+        models.CandidateJobMatch(candidate_id=b.id, job_id=job.id, match_score=0.4, created_at=older),
+    ])
+    db.commit()
+
+    migrations.deduplicate_matches(engine)
+    migrations.ensure_indexes(engine)
+
+    survivors = {(m.candidate_id, m.match_score) for m in db.query(models.CandidateJobMatch)}
+    assert survivors == {(a.id, 0.1), (b.id, 0.4)}
+    assert "uq_candidate_job_matches_pair" in {index["name"] for index in inspect(engine).get_indexes("candidate_job_matches")}
+    db.close()
@@ -216,6 +216,17 @@ def create_candidates():
             logger.error(f"Error creating candidate {candidate['name']}: {str(e)}")
     return created_candidates
 
+def wait_for_processing(candidates, timeout=300):
+    """Poll each candidate's status until background skill extraction has finished."""
+    deadline = time.time() + timeout
+    for candidate in candidates:
+        while time.time() < deadline:
+            status = requests.get(f"{BASE_URL}/candidates/{candidate['id']}/status").json()
+            if status["processing_status"] not in ("pending", "processing"):
+                logger.info(f"Candidate {candidate['id']} {status['processing_status']}: skills {status['skills']}")
+                break
+            time.sleep(1)
+
 def run_auto_screening():
     try:
         logger.info("\nStarting automated screening...")
@@ -224,7 +235,15 @@ def run_auto_screening():
         logger.info(f"Response content: {response.text}")
         
         if response.status_code == 200:
-            matches = response.json()
+            run = response.json()
+            while run["status"] in ("pending", "running"):
+                logger.info(f"Screening progress: {run['pairs_done']}/{run['pairs_total']} (ETA {run['eta_seconds']}s)")
+                time.sleep(2)
+                run = requests.get(f"{BASE_URL}/auto_screen/{run['run_id']}").json()
+            if run["status"] != "completed":
+                logger.error(f"Screening failed: {run['error']}")
+                return
+            matches = run["results"]
             logger.info(f"\nFound {len(matches)} matches:")
             for match in matches:
                 logger.info(f"\nMatch Score: {match['match_score']:.2%}")
@@ -255,6 +274,6 @@ if __name__ == "__main__":
     logger.info(f"\nCreated {len(candidates)} candidates")
     
     logger.info("\nWaiting for processing to complete...")
-    time.sleep(5)  # Give the system time to process
+    wait_for_processing(candidates)
     
     run_auto_screening()
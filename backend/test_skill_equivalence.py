@@ -0,0 +1,51 @@
+from agents.skill_equivalence import SkillEquivalenceStore
+
+def test_refresh_loads_pairs_recorded_by_another_store(tmp_path):
+    path = str(tmp_path / "skills.db")
+    parent, worker = SkillEquivalenceStore(path), SkillEquivalenceStore(path)
+    assert parent.lookup("React", "Preact") is None
+
+    worker.record_many([("React", "Preact", True), ("AWS", "Azure", False)])
+    assert parent.lookup("React", "Preact") is None
+    assert parent.refresh() == 2
+    assert parent.lookup("react", "preact") is True
+    assert parent.lookup("AWS", "Azure") is False
+    assert parent.refresh() == 0
+
+    # Re-recording a pair replaces its row, which gets a new rowid
+    worker.record_many([("AWS", "Azure", True)])
+    assert parent.refresh() == 1
+    assert parent.equivalents("aws") == {"aws", "azure"}
+
+def test_refresh_reloads_after_another_store_clears(tmp_path):
+    path = str(tmp_path / "skills.db")
+    parent, worker = SkillEquivalenceStore(path), SkillEquivalenceStore(path)
+    worker.record_many([("Go", "Golang", True), ("Go", "Rust", False)])
+    parent.refresh()
+    worker.clear()
+    worker.record_many([("SQL", "PostgreSQL", True)])
+    parent.refresh()
+    assert parent.lookup("Go", "Golang") is None
+    assert parent.lookup("SQL", "PostgreSQL") is True
+
+def test_connections_use_wal(tmp_path):
+    store = SkillEquivalenceStore(str(tmp_path / "skills.db"))
+    store.refresh()
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_equivalents_index_follows_recorded_pairs(tmp_path):
+    store = SkillEquivalenceStore(str(tmp_path / "skills.db"))
+    assert not store.loaded
+    store.load()
+    assert store.loaded
+    store.record_many([("React", "Preact", True), ("React", "Vue", True), ("React", "Svelte", False)])
+    assert store.equivalents("react") == {"react", "preact", "vue"}
+    # A pair flipping to incompatible leaves the index
+    store.record_many([("React", "Vue", False)])
+    assert store.equivalents("React") == {"react", "preact"}
+    assert store.equivalents("unknown") == {"unknown"}
+
+    reloaded = SkillEquivalenceStore(str(tmp_path / "skills.db"))
+    assert reloaded.equivalents("react") == {"react", "preact"}
+    assert reloaded.clear() == 3
+    assert reloaded.equivalents("react") == {"react"}
@@ -0,0 +1,27 @@
+from skill_index import SkillIndex
+
+def test_alias_only_candidate_is_not_pruned():
+    index = SkillIndex()
+    index.rebuild([
+        {"id": 1, "skills": ["React.js", "Amazon Web Services"]},
+        {"id": 2, "skills": ["Cobol"]},
+    ])
+    assert index.candidates_for(["React", "AWS"]) == {1}
+    assert index.candidates_for(["React", "AWS"], min_overlap=2) == {1}
+    assert index.candidates_for(["reactjs"]) == {1}
+
+def test_recorded_equivalents_expand_required_skills():
+    index = SkillIndex()
+    index.rebuild([{"id": 1, "skills": ["Flask"]}, {"id": 2, "skills": ["Django"]}])
+    equivalents = {"python web frameworks": {"python web frameworks", "flask"}}
+    expand = lambda skill: equivalents.get(skill, {skill})
+    assert index.candidates_for(["Python web frameworks"], expand=expand) == {1}
+
+def test_add_and_remove_candidate():
+    index = SkillIndex()
+    index.add_candidate(1, ["Golang"])
+    assert index.candidates_for(["Go"]) == {1}
+    index.add_candidate(1, ["Rust"])
+    assert index.candidates_for(["Go"]) == set()
+    index.remove_candidate(1)
+    assert index.candidates_for(["Rust"]) == set()
@@ -0,0 +1,30 @@
+from agents.skill_taxonomy import SkillTaxonomy, skill_taxonomy
+
+def test_extracts_canonical_skills_in_order_of_mention():
+    text = "Built REST APIs with FastAPI and postgres; deployed on k8s via GitHub Actions. Python 3 expert."
+    assert skill_taxonomy.extract(text) == ["REST APIs", "FastAPI", "PostgreSQL", "Kubernetes", "Git", "Python"]
+
+def test_matches_whole_words_only():
+    assert skill_taxonomy.extract("JavaScript and TypeScript") == ["JavaScript", "TypeScript"]
+    assert skill_taxonomy.extract("C++ and C# but not C") == ["C++", "C#", "C"]
+    assert skill_taxonomy.extract("sparkling reactions in a pythonic kafkaesque world") == []
+
+def test_short_aliases_are_case_sensitive():
+    assert skill_taxonomy.extract("Services written in Go and R") == ["Go", "R"]
+    assert skill_taxonomy.extract("ready to go, r u sure") == []
+
+def test_longest_overlapping_match_wins():
+    assert skill_taxonomy.extract("React Native apps, ASP.NET services") == ["React Native", "ASP.NET"]
+    assert skill_taxonomy.extract("react.js front end") == ["React"]
+
+def test_overlapping_aliases_share_automaton_states():
+    taxonomy = SkillTaxonomy({"Ab": ["abc"], "Bcd": ["bcd"], "Cd": ["cde"]})
+    assert taxonomy.extract("x bcd y abc z") == ["Bcd", "Ab"]
+    assert taxonomy.extract("abcde") == []
+
+def test_canonical_and_merge():
+    assert skill_taxonomy.canonical("  Golang ") == "Go"
+    assert skill_taxonomy.canonical("Underwater basket weaving") is None
+    assert "sklearn" in skill_taxonomy
+    merged = skill_taxonomy.merge(["Python", "Docker"], ["python", "docker", "Salesforce", "amazon web services"])
+    assert merged == ["Python", "Docker", "Salesforce", "AWS"]
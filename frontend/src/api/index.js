@@ -1,21 +1,40 @@
 import axios from 'axios';
 
 const API_BASE_URL = 'http://localhost:8000';
+// Rows requested per page from the list endpoints (the server's MAX_PAGE_SIZE)
+const PAGE_SIZE = 1000;
+
+// The list endpoints return one page at a time; follow X-Next-Cursor until the last page
+const getAllPages = async (path, params = {}) => {
+    const items = [];
+    let after;
+    do {
+        const response = await axios.get(`${API_BASE_URL}${path}`, {
+            params: { ...params, limit: PAGE_SIZE, ...(after && { after }) },
+        });
+        items.push(...response.data);
+        after = response.headers['x-next-cursor'];
+    } while (after);
+    return { data: items };
+};
 
 const api = {
     // Jobs
-    getJobs: () => axios.get(`${API_BASE_URL}/jobs`),
+    getJobs: (params) => getAllPages('/jobs', params),
     createJob: (jobData) => axios.post(`${API_BASE_URL}/jobs`, jobData),
     deleteJob: (jobId) => axios.delete(`${API_BASE_URL}/jobs/${jobId}`),
 
     // Candidates
-    getCandidates: () => axios.get(`${API_BASE_URL}/candidates`),
+    getCandidates: (params) => getAllPages('/candidates', params),
     createCandidate: (candidateData) => axios.post(`${API_BASE_URL}/candidates`, candidateData),
     deleteCandidate: (candidateId) => axios.delete(`${API_BASE_URL}/candidates/${candidateId}`),
 
     // Screening
     autoScreen: () => axios.post(`${API_BASE_URL}/auto_screen`),
-    getMatches: () => axios.get(`${API_BASE_URL}/matches`),
+    getScreeningRun: (runId) => axios.get(`${API_BASE_URL}/auto_screen/${runId}`),
+    // NDJSON stream of a run's events, resuming after event `after`; fetch so the body can be read as it arrives
+    streamScreeningRun: (runId, after = 0) => fetch(`${API_BASE_URL}/auto_screen/${runId}/events?after=${after}`),
+    getMatches: (params) => getAllPages('/matches', params),
     matchCandidateJob: (matchData) => axios.post(`${API_BASE_URL}/match_candidate_job`, matchData),
 
     // Interviews
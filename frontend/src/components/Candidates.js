@@ -40,6 +40,7 @@ import {
   GitHub as GitHubIcon,
 } from '@mui/icons-material';
 import axios from 'axios';
+import api from '../api';
 
 const Candidates = () => {
   const [candidates, setCandidates] = useState([]);
@@ -71,7 +72,7 @@ const Candidates = () => {
   const fetchCandidates = async () => {
     setLoading(true);
     try {
-      const response = await axios.get('http://localhost:8000/candidates');
+      const response = await api.getCandidates();
       let sortedCandidates = [...response.data];
       
       if (sortBy === 'newest') {
@@ -37,6 +37,7 @@ import {
   FilterList as FilterIcon,
 } from '@mui/icons-material';
 import axios from 'axios';
+import api from '../api';
 
 const JobDescriptions = () => {
   const [jobs, setJobs] = useState([]);
@@ -63,7 +64,7 @@ const JobDescriptions = () => {
   const fetchJobs = async () => {
     setLoading(true);
     try {
-      const response = await axios.get('http://localhost:8000/jobs');
+      const response = await api.getJobs();
       let sortedJobs = [...response.data];
       
       if (sortBy === 'newest') {
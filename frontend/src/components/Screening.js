@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import api from '../api';
 import {
   Container,
   Grid,
@@ -79,9 +80,9 @@ const Screening = () => {
     setLoading(true);
     try {
       const [jobsRes, candidatesRes, screeningsRes] = await Promise.all([
-        axios.get('http://localhost:8000/jobs'),
-        axios.get('http://localhost:8000/candidates'),
-        axios.get('http://localhost:8000/matches')
+        api.getJobs(),
+        api.getCandidates(),
+        api.getMatches()
       ]);
       setJobs(jobsRes.data);
       setCandidates(candidatesRes.data);
@@ -122,24 +123,62 @@ const Screening = () => {
   const handleAutoScreen = async () => {
     setLoading(true);
     setError(null);
+    setScreenings([]);
     try {
       console.log('Starting auto screening...');
-      const response = await axios.post('http://localhost:8000/auto_screen');
-      console.log('Auto screening response:', response.data);
-      
-      if (Array.isArray(response.data)) {
-        setScreenings(response.data);
-        console.log('Updated screenings:', response.data);
+      const { data: run } = await api.autoScreen();
+
+      // Matches are streamed as NDJSON and shown as soon as each one is scored
+      const response = await api.streamScreeningRun(run.run_id);
+      if (!response.ok) {
+        throw new Error(`Screening request failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let finished = false;
+      while (!finished) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const event = JSON.parse(line);
+          if (event.type === 'match') {
+            setScreenings((current) => [...current, event.match]
+              .sort((a, b) => b.match_score - a.match_score));
+          } else if (event.type === 'summary') {
+            console.log('Auto screening summary:', event);
+            finished = true;
+          } else if (event.type === 'error') {
+            setError(event.detail || 'Failed to complete automatic screening. Please try again.');
+            finished = true;
+          } else if (event.type === 'cancelled') {
+            setError('Automatic screening was cancelled.');
+            finished = true;
+          }
+        }
+      }
+
+      if (finished) {
+        await reader.cancel();
       } else {
-        console.error('Invalid response format:', response.data);
-        setError('Received invalid data format from server');
+        // The stream dropped before the run's final event; the run carries on server-side, so read its state
+        const { data: state } = await api.getScreeningRun(run.run_id);
+        if (state.status === 'completed') {
+          setScreenings(state.results);
+        }
       }
-      
+
       setSelectedJob(null);
       setSelectedCandidate(null);
     } catch (error) {
       console.error('Error in auto screening:', error);
-      setError(error.response?.data?.detail || 'Failed to complete automatic screening. Please try again.');
+      setError(error.message || 'Failed to complete automatic screening. Please try again.');
     } finally {
       setLoading(false);
     }